@@ -2,13 +2,21 @@
 This module provides classes to read, write, and create
 OpenControl repositories.
 """
+import hashlib
+import importlib.metadata
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set
 
 import rtyaml
 from blinker import signal
-from pydantic import BaseModel, PrivateAttr, ValidationError
+from pydantic import BaseModel, PrivateAttr, validator
+from pydantic.fields import SHAPE_DICT, SHAPE_LIST, SHAPE_SET, SHAPE_SINGLETON
 from slugify import slugify
 
 OPENCONTROL_SCHEMA_VERSION = "1.0.0"
@@ -17,7 +25,40 @@ COMPONENT_SCHEMA_VERSION = "3.1.0"
 FILE_SIGNAL = signal("opencontrol_file_operation")
 
 
+def _intern(cls, value):
+    # optional keys may be given as an explicit null
+    return value if value is None else sys.intern(value)
+
+
+def _interned(*fields):
+    # keys such as control and statement keys repeat across every
+    # component, so elements share one string object per key
+    return validator(*fields, allow_reuse=True)(_intern)
+
+
+@lru_cache(maxsize=None)
+def _interned_fields(model):
+    return tuple(
+        name
+        for name, validators in model.__validators__.items()
+        if any(v.func is _intern for v in validators)
+    )
+
+
 class OpenControlElement(BaseModel):
+    class Config:
+        # nested elements are already validated; don't copy them again
+        copy_on_model_validation = "none"
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        # unpickled elements (from a worker process or the load cache)
+        # hold fresh copies of their keys; share the interned ones again
+        values = self.__dict__
+        for name in _interned_fields(type(self)):
+            if values.get(name) is not None:
+                values[name] = sys.intern(values[name])
+
     def new_relative_path(self):
         assert False
 
@@ -42,11 +83,15 @@ class Statement(OpenControlElement):
     text: str
     key: Optional[str]
 
+    _intern_keys = _interned("key")
+
 
 class Parameter(OpenControlElement):
     key: str
     text: str
 
+    _intern_keys = _interned("key")
+
 
 class ImplementationStatusEnum(str, Enum):
     partial = "partial"
@@ -72,6 +117,8 @@ class Control(OpenControlElement):
     parameters: Optional[List[Parameter]]
     _file: str = PrivateAttr()
 
+    _intern_keys = _interned("control_key", "standard_key")
+
 
 class Metadata(OpenControlElement):
     description: str
@@ -110,6 +157,8 @@ class StandardControl(OpenControlElement):
     name: str
     description: str
 
+    _intern_family = _interned("family")
+
 
 class Standard(OpenControlElement):
     name: str
@@ -161,9 +210,9 @@ class OpenControl(OpenControlElement):
     schema_version: str = OPENCONTROL_SCHEMA_VERSION
     name: str
     metadata: Optional[Metadata]
-    components: List[str]
-    standards: List[str]
-    certifications: List[str]
+    components: List[Component]
+    standards: Dict[str, Standard]
+    certifications: List[Certification]
     dependencies: Optional[Dependencies]
 
     _root_dir: str = PrivateAttr()
@@ -176,29 +225,60 @@ class OpenControl(OpenControlElement):
 
     @classmethod
     def debug_file(cls, sender, **kwargs):
-        print(
-            "Loading file" if kwargs["operation"] == "read" else "Writing file",
-            kwargs["path"],
-        )
+        messages = {"read": "Loading file", "missing": "Missing file"}
+        print(messages.get(kwargs["operation"], "Writing file"), kwargs["path"])
 
     @classmethod
-    def load(cls, path: str, debug=True):
+    def load(
+        cls,
+        path: str,
+        debug=True,
+        use_cache=True,
+        validate=True,
+        component_names: Optional[Set[str]] = None,
+        max_workers: Optional[int] = None,
+    ):
         """
         Load an OpenControl repository from a path to the
-        `opencontrol.yaml` file.
+        `opencontrol.yaml` file, resolving its components, standards
+        and certifications. The resolved repository is cached and
+        reused until one of the files it was built from changes.
+        With validate=False only `opencontrol.yaml` itself is
+        validated; the files it refers to are trusted. When
+        component_names is given, only components with those names
+        are resolved. Files are parsed serially unless max_workers
+        is given, in which case larger repositories are parsed in a
+        process pool of that size (callers on platforms that spawn
+        workers need an `if __name__ == "__main__"` guard).
         """
 
         p = Path(path)
         if debug:
             FILE_SIGNAL.connect(OpenControl.debug_file)
 
-        with p.open() as f:
+        cache = _cache_path(p, validate, component_names)
+        cached = _load_cached(cache, p.parent) if use_cache else None
+        if cached is not None:
+            # announce the files the cached repository was built from
+            oc, files = cached
+            for operation, file_path in files:
+                FILE_SIGNAL.send(cls, operation=operation, path=file_path)
+        else:
             FILE_SIGNAL.send(cls, operation="read", path=p)
-            root = rtyaml.load(f)
-            try:
-                return cls(**root)
-            except ValidationError as error:
-                raise error
+            root = _read_yaml(p)
+            oc_yaml = OpenControlYaml.parse_obj(root)
+
+            files = [("read", p)]
+
+            def record_file(sender, **kwargs):
+                files.append((kwargs["operation"], kwargs["path"]))
+
+            with FILE_SIGNAL.connected_to(record_file, sender=oc_yaml):
+                oc = oc_yaml.resolve(p.parent, validate, component_names, max_workers)
+            if use_cache:
+                _save_cached(cache, p.parent, files, oc)
+        oc._root_dir = p.parent
+        return oc
 
     def save(self):
         """Write back an OpenControl repo to where it was loaded"""
@@ -262,6 +342,172 @@ class FenFamily(BaseModel):
     satisfies: List[Control]
 
 
+def _construct(model, data):
+    """
+    Build model from trusted data without validation, recursing into
+    nested models. Values are kept as given (so enums stay strings)
+    and keys that are not fields are dropped.
+    """
+    values = {}
+    for name, field in model.__fields__.items():
+        if name not in data:
+            continue
+        value = data[name]
+        child = field.type_
+        if value is not None:
+            if field.shape == SHAPE_SET:
+                value = set(value)
+            elif isinstance(child, type) and issubclass(child, BaseModel):
+                if field.shape == SHAPE_LIST:
+                    value = [_construct(child, v) for v in value]
+                elif field.shape == SHAPE_DICT:
+                    value = {k: _construct(child, v) for k, v in value.items()}
+                elif field.shape == SHAPE_SINGLETON:
+                    value = _construct(child, value)
+        values[name] = value
+    for name in _interned_fields(model):
+        if values.get(name) is not None:
+            values[name] = sys.intern(values[name])
+    return model.construct(**values)
+
+
+def _build(model, data, validate):
+    return model.parse_obj(data) if validate else _construct(model, data)
+
+
+# with max_workers given, resolve_* only hands files to a process pool
+# when there are enough of them to repay starting the workers
+PARALLEL_MIN_FILES = 16
+
+
+def _map_files(function, paths, max_workers=None):
+    """
+    Return [function(path) for path in paths]. Computed serially unless
+    max_workers is given and there are at least PARALLEL_MIN_FILES
+    paths, then in a process pool of max_workers processes.
+    """
+    if max_workers is None or len(paths) < PARALLEL_MIN_FILES:
+        return [function(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(function, paths, chunksize=4))
+
+
+def _read_yaml(path):
+    # hand libyaml the whole file at once rather than a text stream it
+    # pulls from in small chunks
+    return rtyaml.load(path.read_bytes())
+
+
+def _is_fen(obj):
+    satisfies = obj.get("satisfies", [])
+    if isinstance(satisfies, list) and len(satisfies) > 0:
+        return isinstance(satisfies[0], str)
+    return False
+
+
+@lru_cache(maxsize=256)
+def _load_family(path, mtime_ns, validate):
+    """
+    Parse a fen family file once per process; components commonly share
+    families. The modification time is part of the key so an edited
+    file is read again.
+    """
+    return _build(FenFamily, _read_yaml(Path(path)), validate)
+
+
+def _parse_fen_component(obj, component_path, validate=True):
+    """
+    Build a Component from a fen-style component whose satisfies lists
+    family files. Returns the component, the family files read and
+    those that don't exist.
+    """
+    fc = _build(FenComponent, obj, validate)
+    read = []
+    missing = []
+    resolved_satisfiers = []
+    for satisfier in fc.satisfies:
+        satisfier_path = component_path.parent / satisfier
+        if satisfier_path.is_file():
+            read.append(satisfier_path)
+            family = _load_family(
+                str(satisfier_path.resolve()),
+                satisfier_path.stat().st_mtime_ns,
+                validate,
+            )
+            # each component gets its own controls; the cached family
+            # must not see edits made to a loaded repository
+            for control in family.satisfies:
+                satisfaction = control.copy(deep=True)
+                satisfaction._file = satisfier_path
+                resolved_satisfiers.append(satisfaction)
+        else:
+            missing.append(satisfier_path)
+
+    c = (Component if validate else Component.construct)(
+        schema_version=fc.schema_version,
+        name=fc.name,
+        satisfies=resolved_satisfiers,
+    )
+    return c, read, missing
+
+
+def _parse_component(component_path, validate=True, names=None):
+    """
+    Read one component file. Returns the component, every file read and
+    the family files found missing, so the caller can announce them on
+    FILE_SIGNAL; a worker process has no receivers connected. The
+    component is None when names is given and does not include its name.
+    """
+    obj = _read_yaml(component_path)
+    if names is not None and obj.get("name") not in names:
+        return None, [component_path], []
+    if _is_fen(obj):
+        component, read, missing = _parse_fen_component(
+            obj, component_path, validate
+        )
+        return component, [component_path] + read, missing
+    return _build(Component, obj, validate), [component_path], []
+
+
+def _parse_certification(certification_path, validate=True):
+    return _build(Certification, _read_yaml(certification_path), validate)
+
+
+def _parse_standard(standard_path, validate=True):
+    standard = _load_standard(
+        str(standard_path.resolve()), standard_path.stat().st_mtime_ns, validate
+    )
+    # the caller sets _file on, and may edit, its own copy; the cached
+    # standard must not change with it
+    return standard.copy(deep=True)
+
+
+@lru_cache(maxsize=32)
+def _load_standard(path, mtime_ns, validate):
+    """
+    Parse a standard file once per process. Standards are large and
+    shared by every repository that refers to them; the modification
+    time is part of the key so an edited file is read again.
+    """
+    obj = _read_yaml(Path(path))
+    name = obj.pop("name")
+
+    # TODO: source and license are not in the spec?
+
+    source = obj.pop("source", "")
+    license = obj.pop("license", "")
+
+    controls = {
+        sys.intern(control): _build(StandardControl, desc, validate)
+        for control, desc in obj.items()
+        if "family" in desc
+    }
+
+    return (Standard if validate else Standard.construct)(
+        name=name, controls=controls, source=source, license=license
+    )
+
+
 class OpenControlYaml(BaseModel):
     schema_version: str
     name: str
@@ -279,11 +525,22 @@ class OpenControlYaml(BaseModel):
             path = path / "component.yaml"
         return path
 
-    def resolve(self, relative_to):
-        resolved_components = self.resolve_components(relative_to)
-        resolved_certifications = self.resolve_certifications(relative_to)
-        resolved_standards = self.resolve_standards(relative_to)
-        obj = OpenControl(
+    def resolve(
+        self, relative_to, validate=True, component_names=None, max_workers=None
+    ):
+        """
+        Read the files this repository refers to. With validate=False
+        the files are trusted and models are built without validation;
+        see OpenControl.load() for max_workers.
+        """
+        resolved_components = self.resolve_components(
+            relative_to, validate, component_names, max_workers
+        )
+        resolved_certifications = self.resolve_certifications(
+            relative_to, validate, max_workers
+        )
+        resolved_standards = self.resolve_standards(relative_to, validate, max_workers)
+        obj = (OpenControl if validate else OpenControl.construct)(
             schema_version=self.schema_version,
             name=self.name,
             metadata=self.metadata,
@@ -293,106 +550,187 @@ class OpenControlYaml(BaseModel):
         )
         return obj
 
-    def resolve_components(self, relative_to):
-        resolved_components = []
+    def resolve_components(
+        self, relative_to, validate=True, component_names=None, max_workers=None
+    ):
+        component_paths = []
         for component in self.components:
             component_path = self._component_path(component, relative_to)
-            if component_path.is_file():
-                component = self.resolve_component(component_path)
-                component._file = component_path.relative_to(relative_to)
-                resolved_components.append(component)
-            else:
+            if not component_path.is_file():
                 msg = f"Can't open component file '{component_path}'"
                 raise Exception(msg)
+            component_paths.append(component_path)
+
+        resolved_components = []
+        for component_path, (component, read, missing) in zip(
+            component_paths,
+            _map_files(
+                partial(_parse_component, validate=validate, names=component_names),
+                component_paths,
+                max_workers,
+            ),
+        ):
+            self._announce(read, missing)
+            if component is None:
+                continue
+            component._file = component_path.relative_to(relative_to)
+            resolved_components.append(component)
         return resolved_components
 
     @staticmethod
     def _is_fen(obj):
-        satisfies = obj.get("satisfies", [])
-        if isinstance(satisfies, list) and len(satisfies) > 0:
-            return isinstance(satisfies[0], str)
-        return False
-
-    def resolve_fen_component(self, obj, component_path):
-        fc = FenComponent.parse_obj(obj)
-        resolved_satisfiers = []
-        for satisfier in fc.satisfies:
-            satisfier_path = component_path.parent / satisfier
-            if satisfier_path.is_file():
-                FILE_SIGNAL.send(self, operation="read", path=satisfier_path)
-                with satisfier_path.open() as f:
-                    obj = rtyaml.load(f)
-                    family = FenFamily.parse_obj(obj)
-                    for satisfaction in family.satisfies:
-                        satisfaction._file = satisfier_path
-                        resolved_satisfiers.append(satisfaction)
-
-        c = Component(
-            schema_version=fc.schema_version,
-            name=fc.name,
-            satisfies=resolved_satisfiers,
-        )
+        return _is_fen(obj)
+
+    def _announce(self, read, missing):
+        for path in read:
+            FILE_SIGNAL.send(self, operation="read", path=path)
+        # absent family files are skipped, but creating one changes
+        # the repository, so the load cache needs to hear of them
+        for path in missing:
+            FILE_SIGNAL.send(self, operation="missing", path=path)
+
+    def resolve_fen_component(self, obj, component_path, validate=True):
+        c, read, missing = _parse_fen_component(obj, component_path, validate)
+        self._announce(read, missing)
         return c
 
-    def resolve_component(self, component_path):
-        FILE_SIGNAL.send(self, operation="read", path=component_path)
-        with component_path.open() as f:
-            obj = rtyaml.load(f)
-            if self._is_fen(obj):
-                return self.resolve_fen_component(obj, component_path)
-            else:
-                comp = Component.parse_obj(obj)
-            return comp
-
-    def resolve_certifications(self, relative_to):
-        certifications = []
+    def resolve_component(self, component_path, validate=True):
+        component, read, missing = _parse_component(component_path, validate)
+        self._announce(read, missing)
+        return component
+
+    def resolve_certifications(self, relative_to, validate=True, max_workers=None):
+        certification_paths = []
         for certification in self.certifications:
             certification_path = relative_to / certification
-            if certification_path.is_file():
-                FILE_SIGNAL.send(self, operation="read", path=certification_path)
-                with certification_path.open() as f:
-                    obj = rtyaml.load(f)
-                    cert = Certification.parse_obj(obj)
-                    cert._file = certification
-                    certifications.append(cert)
-            else:
+            if not certification_path.is_file():
                 msg = f"Can't open certification file '{certification_path}'"
                 raise Exception(msg)
+            certification_paths.append(certification_path)
+
+        certifications = []
+        for certification, certification_path, cert in zip(
+            self.certifications,
+            certification_paths,
+            _map_files(
+                partial(_parse_certification, validate=validate),
+                certification_paths,
+                max_workers,
+            ),
+        ):
+            FILE_SIGNAL.send(self, operation="read", path=certification_path)
+            cert._file = certification
+            certifications.append(cert)
         return certifications
 
-    def resolve_standards(self, relative_to):
-        standards = {}
+    def resolve_standards(self, relative_to, validate=True, max_workers=None):
+        standard_paths = []
         for standard in self.standards:
             standard_path = relative_to / standard
-            if standard_path.is_file():
-                FILE_SIGNAL.send(self, operation="read", path=standard_path)
-                with standard_path.open() as f:
-                    obj = rtyaml.load(f)
-                    name = obj.pop("name")
-
-                    # TODO: source and license are not in the spec?
-
-                    source = obj.pop("source", "")
-                    license = obj.pop("license", "")
-
-                    controls = {
-                        control: StandardControl.parse_obj(desc)
-                        for control, desc in obj.items()
-                        if "family" in desc
-                    }
-
-                    std = Standard(
-                        name=name, controls=controls, source=source, license=license
-                    )
-                    std._file = standard
-                    standards[name] = std
-            else:
+            if not standard_path.is_file():
                 raise Exception(f"Can't open standard file '{standard_path}'")
+            standard_paths.append(standard_path)
+
+        standards = {}
+        for standard, standard_path, std in zip(
+            self.standards,
+            standard_paths,
+            _map_files(
+                partial(_parse_standard, validate=validate),
+                standard_paths,
+                max_workers,
+            ),
+        ):
+            FILE_SIGNAL.send(self, operation="read", path=standard_path)
+            std._file = standard
+            standards[sys.intern(std.name)] = std
         return standards
 
     def resolve_dependencies(self, relative_to):
         pass
 
 
-def load(f, debug=False):
-    return OpenControl.load(f, debug)
+# resolved repositories, pickled with the stamps of the files read
+CACHE_DIR = Path.home() / ".cache" / "complianceio" / "opencontrol"
+
+
+def _file_stamp(path):
+    try:
+        st = Path(path).resolve().stat()
+    except FileNotFoundError:
+        return (None, None)
+    return (st.st_mtime_ns, st.st_size)
+
+
+# bump when the pickled layout changes in a way the schema doesn't show
+CACHE_FORMAT = 1
+
+
+@lru_cache(maxsize=None)
+def _cache_schema():
+    """
+    Identify the models a cached repository was pickled with, so a
+    cache written by another version of this package is never loaded.
+    """
+    try:
+        version = importlib.metadata.version("complianceio")
+    except importlib.metadata.PackageNotFoundError:
+        version = "unknown"
+    schema = hashlib.blake2b(OpenControl.schema_json().encode(), digest_size=16)
+    return f"{CACHE_FORMAT}:{version}:{schema.hexdigest()}"
+
+
+def _cache_path(path, validate, component_names):
+    # loads with different options or models are cached apart
+    names = sorted(component_names) if component_names is not None else None
+    key = f"{_cache_schema()}:{path.resolve()}:{validate}:{names}"
+    digest = hashlib.blake2b(key.encode(), digest_size=16)
+    return CACHE_DIR / f"{digest.hexdigest()}.pkl"
+
+
+def _load_cached(cache, root_dir):
+    """
+    Return the OpenControl cached in cache and the (operation, path)
+    file events it was built from, or None if there is no cache or any
+    of those files has changed, appeared or gone since. Paths are kept
+    relative to root_dir, so a repository loaded through a relative
+    path is checked against the same files from any working directory.
+    """
+    try:
+        stamps, oc = pickle.loads(cache.read_bytes())
+        files = [(operation, root_dir / path) for operation, path, _ in stamps]
+        if all(
+            _file_stamp(path) == stamp
+            for (_, path), (_, _, stamp) in zip(files, stamps)
+        ):
+            return oc, files
+    except Exception:
+        # missing, stale or unreadable: rebuild
+        pass
+    return None
+
+
+def _save_cached(cache, root_dir, files, oc):
+    try:
+        stamps = [
+            (operation, os.path.relpath(path, root_dir), _file_stamp(path))
+            for operation, path in dict.fromkeys(files)
+        ]
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(pickle.dumps((stamps, oc), protocol=5))
+        os.replace(tmp, cache)
+    except (OSError, ValueError):
+        # caching is best effort (relpath fails across drives)
+        pass
+
+
+def load(
+    f,
+    debug=False,
+    use_cache=True,
+    validate=True,
+    component_names=None,
+    max_workers=None,
+):
+    return OpenControl.load(f, debug, use_cache, validate, component_names, max_workers)
@@ -0,0 +1,69 @@
+#
+# version 4 UUIDs minted from a shared entropy buffer
+#
+# building a large SSP creates thousands of elements with a default uuid;
+# reading entropy in blocks means one os.urandom call per 1024 UUIDs
+# rather than one per element
+import os
+import threading
+from uuid import UUID
+
+_BLOCK_SIZE = 16384
+
+# RFC 4122 version (4) and variant (10xx) bits of the 128-bit integer
+_CLEAR_BITS = ~((0xF000 << 64) | (0xC000 << 48))
+_SET_BITS = (0x4000 << 64) | (0x8000 << 48)
+
+
+class CachedUUID(UUID):
+    """
+    A UUID that formats its string form once and keeps it.
+    """
+
+    __slots__ = ("_str",)
+
+    def __str__(self):
+        try:
+            return self._str
+        except AttributeError:
+            value = UUID.__str__(self)
+            # UUID blocks normal attribute assignment
+            object.__setattr__(self, "_str", value)
+            return value
+
+
+class _UUIDPool:
+    __slots__ = ("buf", "pos", "lock")
+
+    def __init__(self):
+        self.buf = b""
+        self.pos = _BLOCK_SIZE
+        self.lock = threading.Lock()
+
+    def reset(self):
+        self.buf = b""
+        self.pos = _BLOCK_SIZE
+        # after a fork the old lock may be held by a thread that no
+        # longer exists in this process
+        self.lock = threading.Lock()
+
+    def get(self) -> CachedUUID:
+        """
+        Return a random (version 4) UUID.
+        """
+        with self.lock:
+            if self.pos >= _BLOCK_SIZE:
+                self.buf = os.urandom(_BLOCK_SIZE)
+                self.pos = 0
+            start = self.pos
+            self.pos = end = start + 16
+            n = int.from_bytes(self.buf[start:end], "big")
+        return CachedUUID(int=n & _CLEAR_BITS | _SET_BITS)
+
+
+_pool = _UUIDPool()
+
+# a forked child must not hand out the same UUIDs as its parent
+os.register_at_fork(after_in_child=_pool.reset)
+
+fast_uuid4 = _pool.get
@@ -1,14 +1,15 @@
-import json
 from typing import List
 
+import orjson
+
 
 class Catalog(object):
     """Represent a catalog"""
 
     def __init__(self, source, text=False):
+        self._controls_by_id = None
         try:
             self.oscal = self._load_catalog_json(source, text)
-            json.dumps(self.oscal)
             self.status = "ok"
             self.status_message = "Success loading catalog"
             self.catalog_id = self.oscal.get("id")
@@ -23,13 +24,13 @@ class Catalog(object):
             self.info["groups"] = None
 
     def _load_catalog_json(self, source, text):
-        """Read catalog file - JSON"""
+        """Read catalog file - JSON (source may be str or bytes when text)"""
         oscal: dict = {}
         if text:
-            oscal = json.loads(source)
+            oscal = orjson.loads(source)
         else:
-            with open(source, "r") as f:
-                oscal = json.load(f)
+            with open(source, "rb") as f:
+                oscal = orjson.loads(f.read())
         return oscal.get("catalog")
 
     def find_dict_by_value(self, search_in, search_key: str, search_value: str):
@@ -105,20 +106,16 @@ class Catalog(object):
 
     def get_control_by_id(self, control_id: str) -> dict:
         """
-        Return the dictionary in an array of dictionaries with a key matching a value
+        Return the control (or control enhancement) with an id, or {} if
+        there is none. All controls are indexed by id on the first call.
         """
-        search_array = self.get_controls_all()
-        search_key = "id"
-        search_value = control_id
-        result_dict: dict = next(
-            (
-                s
-                for s in search_array
-                if search_key in s and s[search_key] == search_value
-            ),
-            {},
-        )
-        return result_dict
+        if self._controls_by_id is None:
+            index: dict = {}
+            for control in self.get_controls_all():
+                if "id" in control:
+                    index.setdefault(control["id"], control)
+            self._controls_by_id = index
+        return self._controls_by_id.get(control_id, {})
 
     def get_control_statement(self, control: dict) -> List:
         statement = self.get_control_part_by_name(control, "statement")
@@ -168,7 +165,8 @@ class Catalog(object):
         elif "props" in control:
             prop = self.find_dict_by_value(control.get("props"), "name", property_name)
         else:
-            print("Can't find props (properties) of {:s}".format(control))
+            print(f"Can't find props (properties) of {control.get('id')}")
+            prop = None
         if prop is not None:
             value = prop.get("value")
         return value
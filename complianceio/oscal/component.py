@@ -4,10 +4,10 @@ from enum import Enum
 from typing import List
 from typing import Optional
 from uuid import UUID
-from uuid import uuid4
 
 from pydantic import Field
 
+from ._uuid_pool import fast_uuid4
 from .oscal import BackMatter
 from .oscal import Link
 from .oscal import MarkupLine
@@ -18,6 +18,8 @@ from .oscal import OSCALElement
 from .oscal import Property
 from .oscal import ResponsibleRole
 from .oscal import SetParameter
+from .oscal import interned
+from .oscal import orjson_dumps
 
 
 class ComponentTypeEnum(str, Enum):
@@ -36,23 +38,18 @@ class ComponentTypeEnum(str, Enum):
 
 class Statement(OSCALElement):
     statement_id: NCName
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     description: MarkupMultiLine = MarkupMultiLine("")
     props: Optional[List[Property]]
     links: Optional[List[Link]]
     responsible_roles: Optional[List[ResponsibleRole]]
     remarks: Optional[MarkupMultiLine]
 
-    class Config:
-        fields = {
-            "statement_id": "statement-id",
-            "responsible_roles": "responsible-roles",
-        }
-        allow_population_by_field_name = True
+    _intern_ids = interned("statement_id")
 
 
 class ImplementedRequirement(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     control_id: str
     description: MarkupMultiLine
     props: Optional[List[Property]]
@@ -62,73 +59,40 @@ class ImplementedRequirement(OSCALElement):
     statements: Optional[List[Statement]]
     remarks: Optional[MarkupMultiLine]
 
+    _intern_ids = interned("control_id")
+
     def add_statement(self, statement: Statement):
-        key = statement.statement_id
-        if not self.statements:
-            self.statements = []
-        elif key in self.statements:
-            raise KeyError(
-                f"Statement {key} already in ImplementedRequirement"
-                " for {self.control_id}"
-            )
-        self.statements.append(statement)
-        return self
+        return self._insert("statements", statement, "statement_id")
 
     def add_parameter(self, set_parameter: SetParameter):
-        key = set_parameter.param_id
-        if not self.set_parameters:
-            self.set_parameters = []
-        elif key in self.set_parameters:
-            raise KeyError(
-                f"SetParameter {key} already in ImplementedRequirement"
-                " for {self.control_id}"
-            )
-        self.set_parameters.append(set_parameter)
-        return self
+        return self._insert("set_parameters", set_parameter, "param_id")
 
     def add_property(self, property: Property):
-        key = property.name
+        # OSCAL allows repeated prop names (several "tag" props, say)
         if not self.props:
             self.props = []
-        elif key in self.props:
-            raise KeyError(
-                f"Property {key} already in ImplementedRequirement"
-                " for {self.control_id}"
-            )
         self.props.append(property)
         return self
 
     class Config:
-        fields = {
-            "control_id": "control-id",
-            "responsible_roles": "responsible-roles",
-            "set_parameters": "set-parameters",
-            "properties": "props"
-            
-        }
-        allow_population_by_field_name = True
         exclude_if_false = ["statements", "responsible-roles", "set-parameters"]
 
 
 class ControlImplementation(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     source: str
     description: MarkupMultiLine
     props: Optional[List[Property]]
     links: Optional[List[Link]]
     implemented_requirements: List[ImplementedRequirement] = []
 
-    class Config:
-        fields = {"implemented_requirements": "implemented-requirements"}
-        allow_population_by_field_name = True
-
 
 class Protocol(OSCALElement):
     pass
 
 
 class Component(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     type: ComponentTypeEnum = ComponentTypeEnum.software
     title: MarkupLine
     description: MarkupMultiLine
@@ -141,12 +105,6 @@ class Component(OSCALElement):
     remarks: Optional[MarkupMultiLine]
 
     class Config:
-        fields = {
-            "component_type": "component-type",
-            "control_implementations": "control-implementations",
-            "responsible_roles": "responsible-roles",
-        }
-        allow_population_by_field_name = True
         exclude_if_false = ["control-implementations"]
 
 
@@ -154,12 +112,9 @@ class IncorporatesComponent(OSCALElement):
     component_uuid: UUID
     description: str
 
-    class Config:
-        fields = {"component_uuid": "component-uuid"}
-
 
 class Capability(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     name: str
     description: MarkupMultiLine
     props: Optional[List[Property]]
@@ -167,19 +122,13 @@ class Capability(OSCALElement):
     control_implementations: Optional[List[ControlImplementation]]
     incorporates_components: Optional[List[IncorporatesComponent]]
 
-    class Config:
-        fields = {
-            "control_implementations": "control-implementations",
-            "incorporates_components": "incorporates-components",
-        }
-
 
 class ImportComponentDefinition(OSCALElement):
     href: str  # really uri-reference
 
 
 class ComponentDefinition(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     metadata: Metadata
     components: Optional[List[Component]]
     back_matter: Optional[BackMatter]
@@ -187,31 +136,15 @@ class ComponentDefinition(OSCALElement):
     import_component_definitions: Optional[List[ImportComponentDefinition]]
 
     def add_component(self, component: Component):
-        key = str(component.uuid)
-        # initialize optional component list
-        if not self.components:
-            self.components = []
-        elif key in self.components:
-            raise KeyError(f"Component {key} already in ComponentDefinition")
-        self.components.append(component)
-        return self
+        return self._insert("components", component, "uuid")
+
+    def add_components(self, components: List[Component]):
+        return self._extend("components", components, "uuid")
 
     def add_capability(self, capability: Capability):
-        key = str(capability.uuid)
-        # initialize optional capability list
-        if not self.capabilities:
-            self.capabilities = []
-        elif key in self.capabilities:
-            raise KeyError(f"Capability {key} already in ComponentDefinition")
-        self.capabilities.append(capability)
-        return self
+        return self._insert("capabilities", capability, "uuid")
 
     class Config:
-        fields = {
-            "back_matter": "back-matter",
-            "import_component_definitions": "import-component-definitions",
-        }
-        allow_population_by_field_name = True
         exclude_if_false = ["components", "capabilities"]
 
 
@@ -219,8 +152,7 @@ class Model(OSCALElement):
     component_definition: ComponentDefinition
 
     class Config:
-        fields = {"component_definition": "component-definition"}
-        allow_population_by_field_name = True
+        json_dumps = orjson_dumps
 
     def json(self, **kwargs):
         if "by_alias" in kwargs:
@@ -230,6 +162,13 @@ class Model(OSCALElement):
 
         return super().json(by_alias=True, exclude_none=True, **kwargs)
 
+    def stream_json(self, fp):
+        """
+        Write the model as JSON to the binary file fp without building
+        the whole document in memory first.
+        """
+        self._write_json(fp)
+
 
 class OSCALComponentJson(Model):
     def load(self, f):
@@ -0,0 +1,120 @@
+#
+# helpers for normalizing control identifiers
+#
+# kept free of pydantic so that callers which only need control id
+# handling don't pay for importing the OSCAL models
+import re
+
+_NIST_800_171 = re.compile(r"^\d+\.\d+(\.\d+)*$")
+_NIST_800_53_SIMPLE = re.compile(r"^([a-z]{2})-(\d+)$")
+_NIST_800_53_EXTENDED = re.compile(r"^([a-z]{2})-(\d+)\s*\((\d+)\)$")
+_NIST_800_53_PART = re.compile(r"^([a-z]{2})-(\d+)\.([a-z]+)$")
+_NIST_800_53_EXTENDED_PART = re.compile(r"^([a-z]{2})-(\d+)\s*\((\d+)\)\.([a-z]+)$")
+
+# bound once so the helpers below skip the attribute lookup per attempt
+_match_800_171 = _NIST_800_171.match
+_match_simple = _NIST_800_53_SIMPLE.match
+_match_extended = _NIST_800_53_EXTENDED.match
+_match_part = _NIST_800_53_PART.match
+_match_extended_part = _NIST_800_53_EXTENDED_PART.match
+
+
+class ControlRegExps:
+    nist_800_171 = _NIST_800_171
+    nist_800_53_simple = _NIST_800_53_SIMPLE
+    nist_800_53_extended = _NIST_800_53_EXTENDED
+    nist_800_53_part = _NIST_800_53_PART
+    nist_800_53_extended_part = _NIST_800_53_EXTENDED_PART
+
+
+def oscalize_control_id(control_id):
+    """
+    output an oscal standard control id from various common formats for control ids
+    """
+
+    control_id = control_id.strip()
+    control_id = control_id.lower()
+
+    # 1.2, 1.2.3, 1.2.3.4, etc.
+    if _match_800_171(control_id):
+        return control_id
+
+    # AC-1
+    match = _match_simple(control_id)
+    if match:
+        family = match.group(1)
+        number = int(match.group(2))
+        return f"{family}-{number}"
+
+    # AC-2(1)
+    match = _match_extended(control_id)
+    if match:
+        family = match.group(1)
+        number = int(match.group(2))
+        extension = int(match.group(3))
+        return f"{family}-{number}.{extension}"
+
+    # AC-1.a
+    match = _match_part(control_id)
+    if match:
+        family = match.group(1)
+        number = int(match.group(2))
+        return f"{family}-{number}"
+
+    # AC-2(1).b
+    match = _match_extended_part(control_id)
+    if match:
+        family = match.group(1)
+        number = int(match.group(2))
+        extension = int(match.group(3))
+        return f"{family}-{number}.{extension}"
+
+    return control_id
+
+
+def control_to_statement_id(control_id):
+    """
+    Construct an OSCAL style statement ID from a control identifier.
+    """
+
+    control_id = control_id.strip()
+    control_id = control_id.lower()
+
+    # 1.2, 1.2.3, 1.2.3.4, etc.
+    if _match_800_171(control_id):
+        return f"{control_id}_smt"
+
+    # AC-1
+    match = _match_simple(control_id)
+    if match:
+        family = match.group(1)
+        number = int(match.group(2))
+        return f"{family}-{number}_smt"
+
+    # AC-2(1)
+    match = _match_extended(control_id)
+    if match:
+        family = match.group(1)
+        number = int(match.group(2))
+        extension = int(match.group(3))
+        return f"{family}-{number}.{extension}_smt"
+
+    # AC-1.a
+    match = _match_part(control_id)
+    if match:
+        family = match.group(1)
+        number = int(match.group(2))
+        part = match.group(3)
+        return f"{family}-{number}_smt.{part}"
+
+    # AC-2(1).b
+    match = _match_extended_part(control_id)
+    if match:
+        family = match.group(1)
+        number = int(match.group(2))
+        extension = int(match.group(3))
+        part = match.group(4)
+        return f"{family}-{number}.{extension}_smt.{part}"
+
+    # nothing matched ...
+    return f"{control_id}_smt"
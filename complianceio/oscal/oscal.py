@@ -3,135 +3,164 @@
 # serializing as JSON
 #
 # elements common to component and SSP models
-import re
+import json
+import sys
 from datetime import datetime
 from datetime import timezone
 from enum import Enum
+from typing import Any
+from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Set
+from typing import Tuple
 from uuid import UUID
-from uuid import uuid4
 
+import orjson
 from pydantic import BaseModel
 from pydantic import Field
+from pydantic import PrivateAttr
+from pydantic import validator
+from pydantic.fields import SHAPE_LIST
+from pydantic.fields import SHAPE_SINGLETON
 
-OSCAL_VERSION = "1.0.0"
-
+from ._uuid_pool import fast_uuid4
+from .control_ids import ControlRegExps  # noqa: F401
+from .control_ids import control_to_statement_id  # noqa: F401
+from .control_ids import oscalize_control_id  # noqa: F401
 
-class ControlRegExps:
-    nist_800_171 = re.compile(r"^\d+\.\d+(\.\d+)*$")
-    nist_800_53_simple = re.compile(r"^([a-z]{2})-(\d+)$")
-    nist_800_53_extended = re.compile(r"^([a-z]{2})-(\d+)\s*\((\d+)\)$")
-    nist_800_53_part = re.compile(r"^([a-z]{2})-(\d+)\.([a-z]+)$")
-    nist_800_53_extended_part = re.compile(r"^([a-z]{2})-(\d+)\s*\((\d+)\)\.([a-z]+)$")
+OSCAL_VERSION = "1.0.0"
 
 
-def oscalize_control_id(control_id):
+def orjson_dumps(value, *, default, indent=None, sort_keys=False, **kwargs):
     """
-    output an oscal standard control id from various common formats for control ids
+    Serialize with orjson; used as a model's Config.json_dumps.
+    Options orjson can't honor (an indent other than 2, separators,
+    ensure_ascii, ...) are handed to json.dumps instead.
     """
+    if kwargs or indent not in (None, 2):
+        return json.dumps(
+            value, default=default, indent=indent, sort_keys=sort_keys, **kwargs
+        )
+    option = 0
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(value, default=default, option=option).decode()
+
+
+def _intern(cls, value):
+    return sys.intern(str(value))
 
-    control_id = control_id.strip()
-    control_id = control_id.lower()
-
-    # 1.2, 1.2.3, 1.2.3.4, etc.
-    if re.match(ControlRegExps.nist_800_171, control_id):
-        return control_id
-
-    # AC-1
-    match = re.match(ControlRegExps.nist_800_53_simple, control_id)
-    if match:
-        family = match.group(1)
-        number = int(match.group(2))
-        return f"{family}-{number}"
-
-    # AC-2(1)
-    match = re.match(ControlRegExps.nist_800_53_extended, control_id)
-    if match:
-        family = match.group(1)
-        number = int(match.group(2))
-        extension = int(match.group(3))
-        return f"{family}-{number}.{extension}"
-
-    # AC-1.a
-    match = re.match(ControlRegExps.nist_800_53_part, control_id)
-    if match:
-        family = match.group(1)
-        number = int(match.group(2))
-        return f"{family}-{number}"
-
-    # AC-2(1).b
-    match = re.match(ControlRegExps.nist_800_53_extended_part, control_id)
-    if match:
-        family = match.group(1)
-        number = int(match.group(2))
-        extension = int(match.group(3))
-        return f"{family}-{number}.{extension}"
-
-    return control_id
-
-
-def control_to_statement_id(control_id):
+
+def interned(*fields):
     """
-    Construct an OSCAL style statement ID from a control identifier.
+    Validator that interns the named string fields. Ids such as
+    control-id repeat across many elements, so each element then shares
+    one string object per id.
     """
-
-    control_id = control_id.strip()
-    control_id = control_id.lower()
-
-    # 1.2, 1.2.3, 1.2.3.4, etc.
-    if re.match(ControlRegExps.nist_800_171, control_id):
-        return f"{control_id}_smt"
-
-    # AC-1
-    match = re.match(ControlRegExps.nist_800_53_simple, control_id)
-    if match:
-        family = match.group(1)
-        number = int(match.group(2))
-        return f"{family}-{number}_smt"
-
-    # AC-2(1)
-    match = re.match(ControlRegExps.nist_800_53_extended, control_id)
-    if match:
-        family = match.group(1)
-        number = int(match.group(2))
-        extension = int(match.group(3))
-        return f"{family}-{number}.{extension}_smt"
-
-    # AC-1.a
-    match = re.match(ControlRegExps.nist_800_53_part, control_id)
-    if match:
-        family = match.group(1)
-        number = int(match.group(2))
-        part = match.group(3)
-        return f"{family}-{number}_smt.{part}"
-
-    # AC-2(1).b
-    match = re.match(ControlRegExps.nist_800_53_extended_part, control_id)
-    if match:
-        family = match.group(1)
-        number = int(match.group(2))
-        extension = int(match.group(3))
-        part = match.group(4)
-        return f"{family}-{number}.{extension}_smt.{part}"
-
-    # nothing matched ...
-    return f"{control_id}_smt"
+    return validator(*fields, allow_reuse=True)(_intern)
 
 
 class NCName(str):
-    pass
+    __slots__ = ()
 
 
 class MarkupLine(str):
-    pass
+    __slots__ = ()
 
 
 class MarkupMultiLine(str):
-    pass
+    __slots__ = ()
+
+
+def _dashed(name: str) -> str:
+    return name.replace("_", "-")
+
+
+def _index_key(value):
+    # trees from from_trusted() keep uuids as strings, so a UUID and its
+    # string form must be the same key; CachedUUID formats itself once
+    return str(value) if isinstance(value, UUID) else value
 
 
 class OSCALElement(BaseModel):
+    class Config:
+        # OSCAL JSON names are the field names with dashes for underscores
+        alias_generator = _dashed
+        allow_population_by_field_name = True
+        # child elements are assembled by the caller and handed to their
+        # container; share them rather than copying on every validation
+        copy_on_model_validation = "none"
+
+    # per list filled through _insert(): the id and length of the list
+    # when last indexed, and the keys of its items (see _index_key)
+    _indexes: Optional[Dict[str, Tuple[int, int, Set[Any]]]] = PrivateAttr(default=None)
+
+    def _index(self, field: str, key_field: str):
+        """
+        Return the list in field, created if empty, and the set of its
+        items' key_field values. The index is rebuilt when the list was
+        reassigned or its length changed outside _insert()/_extend();
+        an item replaced in place is not noticed, so lists filled
+        through add_* methods should only be changed through them.
+        """
+        items = getattr(self, field)
+        if not items:
+            items = []
+            setattr(self, field, items)
+        if self._indexes is None:
+            self._indexes = {}
+        indexed = self._indexes.get(field)
+        if indexed is None or indexed[0] != id(items) or indexed[1] != len(items):
+            keys = {_index_key(getattr(i, key_field)) for i in items}
+            indexed = (id(items), len(items), keys)
+            self._indexes[field] = indexed
+        return items, indexed[2]
+
+    def _indexed(self, field: str, items: list, index: Set[Any]):
+        # record the list as indexed after _insert()/_extend() grew it
+        assert self._indexes is not None
+        self._indexes[field] = (id(items), len(items), index)
+
+    def _insert(self, field: str, item, key_field: str):
+        """
+        Append item to the list in field, raising KeyError if an item
+        with the same key_field value is already in that list.
+        """
+        items, index = self._index(field, key_field)
+        key = _index_key(getattr(item, key_field))
+        if key in index:
+            raise KeyError(
+                f"{type(item).__name__} {key} already in {type(self).__name__}"
+            )
+        index.add(key)
+        items.append(item)
+        self._indexed(field, items, index)
+        return self
+
+    def _extend(self, field: str, new_items, key_field: str):
+        """
+        Append all of new_items to the list in field as _insert() would,
+        with one extend for the batch. Nothing is added if any key is
+        already present or repeated within new_items.
+        """
+        items, index = self._index(field, key_field)
+        new_items = list(new_items)
+        keys = set()
+        for item in new_items:
+            key = _index_key(getattr(item, key_field))
+            if key in index or key in keys:
+                raise KeyError(
+                    f"{type(item).__name__} {key} already in {type(self).__name__}"
+                )
+            keys.add(key)
+        index |= keys
+        items.extend(new_items)
+        self._indexed(field, items, index)
+        return self
+
     def dict(self, *args, **kwargs):
         d = super().dict(*args, **kwargs)
         if hasattr(self.Config, "container_assigned"):
@@ -144,15 +173,106 @@ class OSCALElement(BaseModel):
                     del d[key]
         return d
 
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]):
+        """
+        Build an element from OSCAL data that is known to be valid
+        (keyed by OSCAL JSON names or field names) without running
+        validation. Nested elements are built the same way. Values are
+        stored as given, so uuids and dates read from JSON stay strings.
+        """
+        values = {}
+        for name, field in cls.__fields__.items():
+            if field.alias in data:
+                value = data[field.alias]
+            elif name in data:
+                value = data[name]
+            else:
+                continue
+            child = field.type_
+            if (
+                value is not None
+                and isinstance(child, type)
+                and issubclass(child, OSCALElement)
+            ):
+                if field.shape == SHAPE_LIST:
+                    value = [child.from_trusted(v) for v in value]
+                elif field.shape == SHAPE_SINGLETON:
+                    value = child.from_trusted(value)
+            values[name] = value
+        return cls.construct(**values)
+
+    def _write_json(self, fp):
+        """
+        Write this element to the binary file fp as it would appear in
+        .json(by_alias=True, exclude_none=True), one child at a time.
+        """
+        sep = b"{"
+        for name, key, optional, skip_if_false in _json_fields(type(self)):
+            value = getattr(self, name)
+            if optional and value is None:
+                continue
+            if skip_if_false and not value:
+                continue
+            fp.write(sep)
+            sep = b","
+            fp.write(key)
+            _write_json_value(value, fp)
+        fp.write(b"}" if sep == b"," else b"{}")
+
+
+# per class: (field name, encoded '"alias":', optional, skip if false)
+_json_fields_cache: Dict[type, tuple] = {}
+
+
+def _json_fields(cls):
+    fields = _json_fields_cache.get(cls)
+    if fields is None:
+        container_assigned = getattr(cls.__config__, "container_assigned", ())
+        exclude_if_false = getattr(cls.__config__, "exclude_if_false", ())
+        fields = tuple(
+            (
+                name,
+                orjson.dumps(field.alias) + b":",
+                field.allow_none,
+                field.alias in exclude_if_false,
+            )
+            for name, field in cls.__fields__.items()
+            if field.alias not in container_assigned
+        )
+        _json_fields_cache[cls] = fields
+    return fields
+
+
+def _json_default(value):
+    # orjson only handles exact UUID instances natively
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError
+
+
+def _write_json_value(value, fp):
+    if isinstance(value, OSCALElement):
+        value._write_json(fp)
+    elif isinstance(value, list):
+        fp.write(b"[")
+        for i, item in enumerate(value):
+            if i:
+                fp.write(b",")
+            _write_json_value(item, fp)
+        fp.write(b"]")
+    else:
+        fp.write(orjson.dumps(value, default=_json_default))
+
 
 class Property(OSCALElement):
     name: str
     value: str
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
 
 
 class Resource(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     title: Optional[str]
     description: Optional[MarkupMultiLine]
     props: Optional[List[Property]]
@@ -176,10 +296,6 @@ class Link(OSCALElement):
     rel: Optional[LinkRelEnum]
     media_type: Optional[str]
 
-    class Config:
-        fields = {"media_type": "media-type"}
-        allow_population_by_field_name = True
-
 
 class Annotation(OSCALElement):
     name: NCName
@@ -194,7 +310,7 @@ class BackMatter(OSCALElement):
 
 
 class EmailAddress(str):
-    pass
+    __slots__ = ()
 
 
 class TelephoneNumber(OSCALElement):
@@ -210,10 +326,6 @@ class Revision(OSCALElement):
     oscal_version: Optional[str]
     props: Optional[List[Property]]
 
-    class Config:
-        fields = {"last_modified": "last-modified", "oscal_version": "oscal-version"}
-        allow_population_by_field_name = True
-
 
 class DocumentId(OSCALElement):
     scheme: str  # really, URI
@@ -226,7 +338,7 @@ class PartyTypeEnum(str, Enum):
 
 
 class Party(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     type: PartyTypeEnum
     name: Optional[str]
     short_name: Optional[str]
@@ -237,15 +349,6 @@ class Party(OSCALElement):
     telephone_numbers: Optional[List[TelephoneNumber]]
     remarks: Optional[MarkupMultiLine]
 
-    class Config:
-        fields = {
-            "party_name": "party-name",
-            "short_name": "short-name",
-            "email_addresses": "email-addresses",
-            "telephone_numbers": "telephone-numbers",
-        }
-        allow_population_by_field_name = True
-
 
 class Location(OSCALElement):
     pass
@@ -292,10 +395,6 @@ class ResponsibleParty(OSCALElement):
     links: Optional[List[Link]]
     remarks: Optional[MarkupMultiLine]
 
-    class Config:
-        fields = {"party_uuids": "party-uuids"}
-        allow_population_by_field_name = True
-
 
 class Metadata(OSCALElement):
     title: str
@@ -314,14 +413,7 @@ class Metadata(OSCALElement):
     remarks: Optional[MarkupMultiLine]
 
     class Config:
-        fields = {
-            "oscal_version": "oscal-version",
-            "document_ids": "document-ids",
-            "last_modified": "last-modified",
-            "responsible_parties": "responsible-parties",
-        }
         exclude_if_false = ["responsible-parties"]
-        allow_population_by_field_name = True
 
 
 class SetParameter(OSCALElement):
@@ -329,9 +421,7 @@ class SetParameter(OSCALElement):
     values: List[str] = []
     remarks: Optional[MarkupMultiLine]
 
-    class Config:
-        fields = {"param_id": "param-id"}
-        allow_population_by_field_name = True
+    _intern_ids = interned("param_id")
 
 
 class ResponsibleRole(OSCALElement):
@@ -340,7 +430,3 @@ class ResponsibleRole(OSCALElement):
     links: Optional[List[Link]]
     party_uuids: Optional[List[UUID]]
     remarks: Optional[MarkupMultiLine]
-
-    class Config:
-        fields = {"party_uuids": "party-uuids"}
-        allow_population_by_field_name = True
@@ -4,10 +4,10 @@ from datetime import datetime
 from typing import List
 from typing import Optional
 from uuid import UUID
-from uuid import uuid4
 
 from pydantic import Field
 
+from ._uuid_pool import fast_uuid4
 from .oscal import Annotation
 from .oscal import BackMatter
 from .oscal import Link
@@ -23,6 +23,8 @@ from .oscal import ResponsibleParty
 from .oscal import ResponsibleRole
 from .oscal import Role
 from .oscal import SetParameter
+from .oscal import interned
+from .oscal import orjson_dumps
 
 
 class ImportProfile(OSCALElement):
@@ -35,19 +37,11 @@ class Impact(OSCALElement):
     selected: Optional[str]
     adjustment_justification: Optional[MarkupMultiLine]
 
-    class Config:
-        fields = {"adjustment_justification": "adjustment-justification"}
-        allow_population_by_field_name = True
-
 
 class Categorization(OSCALElement):
     system: str  # really URI
     information_type_ids: Optional[List[str]]
 
-    class Config:
-        fields = {"information_type_ids": "information-type-ids"}
-        allow_population_by_field_name = True
-
 
 class InformationType(OSCALElement):
     uuid: Optional[UUID]
@@ -60,27 +54,15 @@ class InformationType(OSCALElement):
     integrity_impact: Impact
     availability_impact: Impact
 
-    class Config:
-        fields = {
-            "confidentiality_impact": "confidentiality-impact",
-            "integrity_impact": "integrity-impact",
-            "availability_impact": "availability-impact",
-        }
-        allow_population_by_field_name = True
-
 
 class SystemInformation(OSCALElement):
     props: Optional[List[Property]]
     links: Optional[List[Link]]
     information_types: List[InformationType] = []
 
-    class Config:
-        fields = {"information_types": "information-types"}
-        allow_population_by_field_name = True
-
 
 class Diagram(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     description: Optional[MarkupMultiLine]
     props: Optional[List[Property]]
     links: Optional[List[Link]]
@@ -96,13 +78,7 @@ class NetworkDiagram(OSCALElement):
     remarks: Optional[MarkupMultiLine]
 
     def add_diagram(self, diagram: Diagram):
-        key = str(diagram.uuid)
-        if not self.diagrams:
-            self.diagrams = []
-        elif key in self.diagram:
-            raise KeyError(f"Diagram {key} already in NetworkDiagram")
-        self.diagrams.append(diagram)
-        return self
+        return self._insert("diagrams", diagram, "uuid")
 
     class Config:
         exclude_if_false = ["diagrams"]
@@ -113,23 +89,11 @@ class SecurityImpactLevel(OSCALElement):
     security_objective_integrity: str
     security_objective_availability: str
 
-    class Config:
-        fields = {
-            "security_objective_confidentiality": "security-objective-confidentiality",
-            "security_objective_integrity": "security-objective-integrity",
-            "security_objective_availability": "security-objective-availability",
-        }
-        allow_population_by_field_name = True
-
 
 class SystemId(OSCALElement):
     identifier_type: Optional[str]  # really URI
     id: Optional[str]
 
-    class Config:
-        fields = {"identifier_type": "identifier-type"}
-        allow_population_by_field_name = True
-
 
 class SystemStatus(OSCALElement):
     state: NCName
@@ -154,24 +118,9 @@ class SystemCharacteristics(OSCALElement):
     responsible_parties: Optional[List[ResponsibleParty]]
     remarks: Optional[MarkupMultiLine]
 
-    class Config:
-        fields = {
-            "system_ids": "system-ids",
-            "system_name": "system-name",
-            "system_name_short": "system-name-short",
-            "authorization_boundary": "authorization-boundary",
-            "network_architecture": "network-architecture",
-            "data_flow": "data-flow",
-            "security_sensitivity_level": "security-sensitivity-level",
-            "security_impact_level": "security-impact-level",
-            "system_information": "system-information",
-            "responsible_parties": "responsible-parties",
-        }
-        allow_population_by_field_name = True
-
 
 class User(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     title: Optional[MarkupLine]
     short_name: Optional[str]
     description: Optional[MarkupMultiLine]
@@ -182,21 +131,13 @@ class User(OSCALElement):
     authorized_privileges: Optional[List[str]]
     remarks: Optional[MarkupMultiLine]
 
-    class Config:
-        fields = {
-            "authorized_privileges": "authorized-privileges",
-            "short_name": "short-name",
-            "role_ids": "role-ids",
-        }
-        allow_population_by_field_name = True
-
 
 class Protocol(OSCALElement):
     pass
 
 
 class Component(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     type: str
     title: MarkupLine
     description: MarkupMultiLine
@@ -209,8 +150,6 @@ class Component(OSCALElement):
     remarks: Optional[MarkupMultiLine]
 
     class Config:
-        fields = {"responsible_roles": "responsible-roles"}
-        allow_population_by_field_name = True
         exclude_if_false = ["responsible-roles"]
 
 
@@ -221,12 +160,6 @@ class ImplementedComponent(OSCALElement):
     responsible_parties: Optional[List[ResponsibleParty]]
     remarks: Optional[MarkupMultiLine]
 
-    class Config:
-        fields = {
-            "component_uuid": "component-uuid",
-            "responsible_parties": "responsible-parties",
-        }
-
 
 class LeveragedAuthorization(OSCALElement):
     uuid: UUID
@@ -237,12 +170,9 @@ class LeveragedAuthorization(OSCALElement):
     date_authorized: datetime
     remarks: Optional[MarkupMultiLine]
 
-    class Config:
-        fields = {"party_uuid": "party-uuid", "date_authorized": "date-authorized"}
-
 
 class InventoryItem(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     description: MarkupMultiLine
     props: Optional[List[Property]]
     links: Optional[List[Link]]
@@ -250,12 +180,6 @@ class InventoryItem(OSCALElement):
     implemented_components: Optional[List[ImplementedComponent]]
     remarks: Optional[MarkupMultiLine]
 
-    class Config:
-        fields = {
-            "responsible_parties": "responsible-parties",
-            "implemented_components": "implemented-components",
-        }
-
 
 class SystemImplementation(OSCALElement):
     props: Optional[List[Property]]
@@ -267,24 +191,14 @@ class SystemImplementation(OSCALElement):
     remarks: Optional[MarkupMultiLine]
 
     def add_component(self, component: Component):
-        key = str(component.uuid)
-        if not self.components:
-            self.components = []
-        elif key in self.components:
-            raise KeyError(f"Component {key} already in SystemImplementation")
-        self.components.append(component)
-        return self
+        return self._insert("components", component, "uuid")
 
-    class Config:
-        fields = {
-            "leveraged_authorizations": "leveraged-authorizations",
-            "inventory_items": "inventory-items",
-        }
-        allow_population_by_field_name = True
+    def add_components(self, components: List[Component]):
+        return self._extend("components", components, "uuid")
 
 
 class Provided(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     description: MarkupMultiLine
     props: Optional[List[Property]]
     annotations: Optional[List[Annotation]]
@@ -293,12 +207,11 @@ class Provided(OSCALElement):
     remarks: Optional[MarkupMultiLine]
 
     class Config:
-        fields = {"responsible_roles": "responsible-roles"}
         exclude_if_false = ["responsible-roles"]
 
 
 class Responsibility(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     provided_uuid: Optional[UUID]
     description: MarkupMultiLine
     props: Optional[List[Property]]
@@ -307,10 +220,6 @@ class Responsibility(OSCALElement):
     remarks: Optional[MarkupMultiLine]
 
     class Config:
-        fields = {
-            "provided_uuid": "provided-uuid",
-            "responsible_roles": "responsible-roles",
-        }
         exclude_if_false = ["responsible-roles"]
 
 
@@ -329,7 +238,7 @@ class Export(OSCALElement):
 
 
 class Inherited(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     provided_uuid: Optional[UUID]
     description: MarkupMultiLine
     props: Optional[List[Property]]
@@ -337,15 +246,11 @@ class Inherited(OSCALElement):
     responsible_roles: Optional[List[ResponsibleRole]]
 
     class Config:
-        fields = {
-            "provided_uuid": "provided-uuid",
-            "responsible_roles": "responsible-roles",
-        }
         exclude_if_false = ["responsible-roles"]
 
 
 class Satisfied(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     responsibility_uuid: Optional[UUID]
     description: MarkupMultiLine
     props: Optional[List[Property]]
@@ -354,16 +259,12 @@ class Satisfied(OSCALElement):
     remarks: Optional[MarkupMultiLine]
 
     class Config:
-        fields = {
-            "responsibility_uuid": "responsibility-uuid",
-            "responsible_roles": "responsible-roles",
-        }
         exclude_if_false = ["responsible-roles"]
 
 
 class ByComponent(OSCALElement):
     component_uuid: UUID
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     description: MarkupMultiLine
     props: Optional[List[Property]]
     links: Optional[List[Link]]
@@ -376,46 +277,32 @@ class ByComponent(OSCALElement):
     remarks: Optional[MarkupMultiLine]
 
     class Config:
-        fields = {
-            "component_uuid": "component-uuid",
-            "set_parameters": "set-parameters",
-            "implementation_status": "implementation-status",
-            "responsible_roles": "responsible-roles",
-        }
-        allow_population_by_field_name = True
         exclude_if_false = ["responsible-roles"]
 
 
 class Statement(OSCALElement):
     statement_id: NCName
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     props: Optional[List[Property]]
     links: Optional[List[Link]]
     responsible_roles: Optional[List[ResponsibleRole]]
     by_components: Optional[List[ByComponent]]
     remarks: Optional[MarkupMultiLine]
 
+    _intern_ids = interned("statement_id")
+
     def add_by_component(self, by_component: ByComponent):
-        key = str(by_component.component_uuid)
-        if not self.by_components:
-            self.by_components = []
-        elif key in self.by_components:
-            raise KeyError(f"By Component {key} already in Statement")
-        self.by_components.append(by_component)
-        return self
+        return self._insert("by_components", by_component, "component_uuid")
+
+    def add_by_components(self, by_components: List[ByComponent]):
+        return self._extend("by_components", by_components, "component_uuid")
 
     class Config:
-        fields = {
-            "statement_id": "statement-id",
-            "responsible_roles": "responsible-roles",
-            "by_components": "by-components",
-        }
         exclude_if_false = ["by-components"]
-        allow_population_by_field_name = True
 
 
 class ImplementedRequirement(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     control_id: NCName
     props: Optional[List[Property]]
     links: Optional[List[Link]]
@@ -425,47 +312,21 @@ class ImplementedRequirement(OSCALElement):
     by_components: Optional[List[ByComponent]]
     remarks: Optional[MarkupMultiLine]
 
+    _intern_ids = interned("control_id")
+
     def add_statement(self, statement: Statement):
-        key = statement.statement_id
-        if not self.statements:
-            self.statements = []
-        elif key in self.statements:
-            raise KeyError(
-                f"Statement {key} already in ImplementedRequirement"
-                " for {self.control_id}"
-            )
-        self.statements.append(statement)
-        return self
+        return self._insert("statements", statement, "statement_id")
 
     def add_parameter(self, set_parameter: SetParameter):
-        key = set_parameter.param_id
-        if not self.set_parameters:
-            self.set_parameters = []
-        elif key in self.set_parameters:
-            raise KeyError(
-                f"SetParameter {key} already in ImplementedRequirement"
-                " for {self.control_id}"
-            )
-        self.set_parameters.append(set_parameter)
-        return self
+        return self._insert("set_parameters", set_parameter, "param_id")
 
     def add_by_component(self, by_component: ByComponent):
-        key = str(by_component.component_uuid)
-        if not self.by_components:
-            self.by_components = []
-        elif key in self.by_components:
-            raise KeyError(f"By Component for component {key} already in Statement")
-        self.by_components.append(by_component)
-        return self
+        return self._insert("by_components", by_component, "component_uuid")
+
+    def add_by_components(self, by_components: List[ByComponent]):
+        return self._extend("by_components", by_components, "component_uuid")
 
     class Config:
-        fields = {
-            "control_id": "control-id",
-            "by_components": "by-components",
-            "set_parameters": "set-parameters",
-            "responsible_roles": "responsible-roles",
-        }
-        allow_population_by_field_name = True
         exclude_if_false = ["by-components", "responsible-roles"]
 
 
@@ -474,16 +335,9 @@ class ControlImplementation(OSCALElement):
     set_parameters: Optional[List[SetParameter]]
     implemented_requirements: List[ImplementedRequirement]
 
-    class Config:
-        fields = {
-            "implemented_requirements": "implemented-requirements",
-            "set_parameters": "set-parameters",
-        }
-        allow_population_by_field_name = True
-
 
 class SystemSecurityPlan(OSCALElement):
-    uuid: UUID = Field(default_factory=uuid4)
+    uuid: UUID = Field(default_factory=fast_uuid4)
     metadata: Metadata
     import_profile: ImportProfile
     system_characteristics: SystemCharacteristics
@@ -491,23 +345,12 @@ class SystemSecurityPlan(OSCALElement):
     control_implementation: ControlImplementation
     back_matter: Optional[BackMatter]
 
-    class Config:
-        fields = {
-            "import_profile": "import-profile",
-            "system_characteristics": "system-characteristics",
-            "system_implementation": "system-implementation",
-            "control_implementation": "control-implementation",
-            "back_matter": "back-matter",
-        }
-        allow_population_by_field_name = True
-
 
 class Model(OSCALElement):
     system_security_plan: SystemSecurityPlan
 
     class Config:
-        fields = {"system_security_plan": "system-security-plan"}
-        allow_population_by_field_name = True
+        json_dumps = orjson_dumps
 
     def json(self, **kwargs):
         if "by_alias" in kwargs:
@@ -517,6 +360,13 @@ class Model(OSCALElement):
 
         return super().json(by_alias=True, exclude_none=True, **kwargs)
 
+    def stream_json(self, fp):
+        """
+        Write the model as JSON to the binary file fp without building
+        the whole document in memory first.
+        """
+        self._write_json(fp)
+
 
 def main():
     md = Metadata(title="System Security Plan", version="1.2.3")
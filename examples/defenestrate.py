@@ -1,7 +1,5 @@
 import click
 
-from complianceio import opencontrol
-
 
 @click.command()
 @click.argument(
@@ -13,6 +11,10 @@ from complianceio import opencontrol
     type=click.Path(dir_okay=True, exists=True, file_okay=False, resolve_path=True),
 )
 def main(source, dest):
+    # loading the OpenControl models pulls in pydantic; defer it so
+    # --help and argument errors return without paying for it
+    from complianceio import opencontrol
+
     opencontrol.load(source, debug=True).save_as(dest)
 
 
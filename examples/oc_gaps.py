@@ -1,14 +1,17 @@
-from itertools import groupby
+import functools
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import urlparse
 
 import click
-import json
-import yaml
-import requests
+import orjson
 
 from complianceio import opencontrol
-from complianceio.oscal.oscal import oscalize_control_id
 from complianceio.oscal.catalogio import Catalog
+from complianceio.oscal.control_ids import oscalize_control_id
 
 """
 Read opencontrol.yaml and perform gap analysis against a Catalog Baseline.
@@ -49,19 +52,92 @@ def get_source_uri(standard_key):
     return source_uri
 
 
+CACHE_DIR = Path.home() / ".cache" / "complianceio"
+CACHE_MAX_AGE = 24 * 60 * 60
+
+
+@functools.lru_cache(maxsize=None)
+def http_session():
+    """
+    One requests session per run, so catalog and profile downloads from
+    the same host reuse connections. Created on the first cache miss.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    # room for every prefetch_catalogs() worker
+    session.mount("https://", HTTPAdapter(pool_maxsize=8))
+    return session
+
+
+def fetch_cached(source_uri):
+    """
+    Return the body at source_uri, reusing a copy saved under
+    ~/.cache/complianceio if it is less than a day old.
+    Used for both catalogs and profiles.
+    """
+    # ARS profiles are named after their version only (3.1.yml), so
+    # keep the parent directory in the name as well
+    path = Path(urlparse(source_uri).path)
+    cache_file = CACHE_DIR / f"{path.parent.name}_{path.name}"
+    if cache_file.is_file():
+        if time.time() - cache_file.stat().st_mtime < CACHE_MAX_AGE:
+            return cache_file.read_bytes()
+    response = http_session().get(source_uri)
+    response.raise_for_status()
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache_file.write_bytes(response.content)
+    return response.content
+
+
+@functools.lru_cache(maxsize=None)
+def load_control_labels(source_uri):
+    """
+    Map each control id in the catalog at source_uri to its label.
+    Only this index is kept; the parsed catalog is discarded.
+    """
+    catalog = Catalog(fetch_cached(source_uri), True)
+    labels = {}
+    for control in catalog.get_controls_all():
+        # read props directly: the Catalog helper prints to stdout when a
+        # control has none, which would corrupt --json output
+        props = control.get("props") or control.get("properties") or []
+        label = next((p.get("value") for p in props if p.get("name") == "label"), "")
+        # the first control with an id wins, as with Catalog lookups
+        labels.setdefault(control["id"], label)
+    return labels
+
+
+def prefetch_catalogs(standard_keys):
+    """
+    Fetch and index the catalogs for standard_keys in parallel, so the
+    per-component loop finds them in load_control_labels' cache.
+    """
+    source_uris = {get_source_uri(key) for key in standard_keys}
+    if len(source_uris) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(source_uris), 8)) as executor:
+            # consume the results so a failed download raises here
+            list(executor.map(load_control_labels, source_uris))
+
+
+@functools.lru_cache(maxsize=None)
+def profile_control_keys(standard_key, profile_ids):
+    """
+    Labels of the catalog controls for standard_key that are in
+    profile_ids (a tuple, so it can be cached), in profile order.
+    """
+    labels = load_control_labels(get_source_uri(standard_key))
+    return tuple(labels[id] for id in profile_ids if id in labels)
+
+
 def get_catalog_keys(standard_key, profile_ids):
-    keys = {}
-    source_uri = get_source_uri(standard_key)
-    url = requests.get(source_uri)
+    keys = profile_control_keys(standard_key, tuple(profile_ids))
+    # each key needs its own list: callers append findings to them
+    return {key: [] for key in keys}
 
-    catalog = Catalog(url.text, True)
 
-    for id in profile_ids:
-        control = catalog.get_control_by_id(id)
-        if control:
-            prop = catalog.get_control_property_by_name(control, "label")
-            keys[prop] = []
-    return keys
+NOT_IN_PROFILE = " Not in Profile"
 
 
 def parse_opencontrol_components(source, profile_ids):
@@ -69,18 +145,34 @@ def parse_opencontrol_components(source, profile_ids):
     Read an OpenControl repo and perform gap analysis against a Catalog.
     """
 
-    catalog_keys = {}
+    # findings[standard][control_key] lists each system's contribution;
+    # profile_keys[standard] is the fixed set of keys in the profile
+    findings = {}
+    profile_keys = {}
 
     p = Path(source)
     oc = opencontrol.load(p)
 
+    prefetch_catalogs(
+        {control.standard_key for comp in oc.components for control in comp.satisfies}
+    )
+
     for comp in oc.components:
-        sorted_controls = sorted(comp.satisfies, key=lambda c: c.standard_key)
-        grouped_controls = groupby(sorted_controls, lambda c: c.standard_key)
+        if comp.key:
+            system = comp.key
+        else:
+            system = comp.name
 
-        for standard, controls in grouped_controls:
-            if standard not in catalog_keys:
-                catalog_keys[standard] = get_catalog_keys(standard, profile_ids)
+        grouped_controls = defaultdict(list)
+        for control in comp.satisfies:
+            grouped_controls[control.standard_key].append(control)
+
+        for standard, controls in grouped_controls.items():
+            if standard not in findings:
+                findings[standard] = get_catalog_keys(standard, profile_ids)
+                profile_keys[standard] = frozenset(findings[standard])
+            standard_findings = findings[standard]
+            in_profile = profile_keys[standard]
 
             for control in controls:
                 key = control.control_key
@@ -88,53 +180,45 @@ def parse_opencontrol_components(source, profile_ids):
                         control.parameters and
                         control.parameters[0].key == "security_control_type"
                 ):
-                    if key in catalog_keys[standard]:
-                        control_type = control.parameters[0].text
-                    else:
-                        catalog_keys[standard][key] = []
-                        control_type = control.parameters[0].text + " Not in Profile"
-                else:
-                    if key in catalog_keys[standard]:
-                        control_type = "Shared"
-                    else:
-                        catalog_keys[standard][key] = []
-                        control_type = "Shared Not in Profile"
-
-                if comp.key:
-                    system = comp.key
+                    control_type = control.parameters[0].text
                 else:
-                    system = comp.name
-                catalog_keys[standard][key].append(
+                    control_type = "Shared"
+                if key not in in_profile:
+                    control_type += NOT_IN_PROFILE
+
+                standard_findings.setdefault(key, []).append(
                             {"system": system,
                              "security_control_type": control_type}
                 )
-    return catalog_keys
+    return findings
 
 
 def read_nist_json_profile_ids(profile_url, quiet):
-    url = requests.get(profile_url)
-    profile = json.loads(url.text)
+    profile = orjson.loads(fetch_cached(profile_url))
     title = profile["profile"]["metadata"]["title"]
-    profile_ids = profile["profile"]["imports"][0]["include-controls"][0]["with-ids"]
+    with_ids = profile["profile"]["imports"][0]["include-controls"][0]["with-ids"]
+    # same shape as the ARS reader: ordered, O(1) membership, and a
+    # description for pretty_print_list()
+    profile_ids = dict.fromkeys(with_ids, title)
     if not quiet:
         print(f'{len(profile_ids)} controls in {title}')
     return profile_ids
 
 
 def read_ars_yaml_profile_ids(ars, impact_level, quiet):
-    ars_yml = (
+    import yaml
+
+    profile_url = (
         'https://raw.githubusercontent.com/CMSgov/ars-machine-readable/main/'
-        '{:s}/generic/{:s}.yml'
+        f'{ars}/generic/{ars}.yml'
     )
-    profile_url = ars_yml.format(ars, ars)
-    url = requests.get(profile_url)
-    profile = yaml.safe_load(url.text)
+    # libyaml's C loader when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    profile = yaml.load(fetch_cached(profile_url), Loader=loader)
 
-    # profile_ids = []
     profile_ids = {}
     for control, data in profile.items():
         if data["Baseline"] and impact_level in data["Baseline"]:
-            # profile_ids.append(oscalize_control_id(control))
             ctrl = profile.get(control)
             family_name = (
                 f'{ctrl.get("Control Family")} : {ctrl.get("Control Name")}'
@@ -145,8 +229,25 @@ def read_ars_yaml_profile_ids(ars, impact_level, quiet):
     return profile_ids
 
 
+@functools.lru_cache(maxsize=None)
+def report_column(security_control_type):
+    """
+    Report column for a security_control_type. There are only a handful
+    of distinct types, so each is classified once.
+    """
+    # the suffix is ours; the rest is the component's own wording
+    not_in_profile = security_control_type.endswith(NOT_IN_PROFILE)
+    if "Inherit" in security_control_type:
+        return "not_in" if not_in_profile else "inherit"
+    return "not_hy" if not_in_profile else "hybrid"
+
+
+def new_report_columns():
+    return {"inherit": [], "hybrid": [], "not_in": [], "not_hy": []}
+
+
 def prepare_report(gap_analysis, quiet):
-    rv = {}
+    rv = defaultdict(new_report_columns)
     empty = []
     for standard, controls in gap_analysis.items():
         if not quiet:
@@ -159,49 +260,34 @@ def prepare_report(gap_analysis, quiet):
                 for type in types:
                     system = type["system"]
                     secure = type["security_control_type"]
-                    if system not in rv:
-                        rv[system] = {
-                            "inherit": [],
-                            "hybrid": [],
-                            "not_in": [],
-                            "not_hy": []
-                        }
-                    if "Inherit" in secure:
-                        if "Not" in secure:
-                            rv[system]["not_in"].append(control)
-                        else:
-                            rv[system]["inherit"].append(control)
-                    else:
-                        if "Not" in secure:
-                            rv[system]["not_hy"].append(control)
-                        else:
-                            rv[system]["hybrid"].append(control)
+                    rv[system][report_column(secure)].append(control)
         rv["Empty"] = empty
 
     # Remove hybrid controls that are Inherited
     systems = list(rv.keys())
     systems.remove("Empty")
-    all_inherited = []
+    all_inherited = set()
     for system in systems:
-        all_inherited.extend(rv[system]["inherit"])
+        all_inherited.update(rv[system]["inherit"])
         rv[system]["Both"] = []
     for system in systems:
-        if rv[system]["inherit"]:
+        columns = rv[system]
+        if columns["inherit"]:
             continue
-        dupes = []
-        for control in rv[system]["hybrid"]:
-            if control in all_inherited:
-                rv[system]["Both"].append(control)
-                dupes.append(control)
-        if dupes:
-            for dupe in dupes:
-                rv[system]["hybrid"].remove(dupe)
-    return rv
+        hybrid = columns["hybrid"]
+        both = [control for control in hybrid if control in all_inherited]
+        if both:
+            columns["Both"] = both
+            columns["hybrid"] = [
+                control for control in hybrid if control not in all_inherited
+            ]
+    # callers look systems up by name; don't create them on a miss
+    return dict(rv)
 
 
 def print_report(rv):
-    print(f'{"System":<15} {"Inherited":<10} {"Hybrid":<8} '
-          f'{"In-Not":<8} {"Hy-Not":<8} {"Total":<8}| {"(In+Hy)":<8}')
+    lines = [f'{"System":<15} {"Inherited":<10} {"Hybrid":<8} '
+             f'{"In-Not":<8} {"Hy-Not":<8} {"Total":<8}| {"(In+Hy)":<8}']
     tot_in = 0
     tot_hy = 0
     tot_bo = 0
@@ -210,23 +296,24 @@ def print_report(rv):
     totals = 0
     empty = rv.pop("Empty")
     for system, values in rv.items():
-        inherit = len(rv[system]["inherit"])
+        inherit = len(values["inherit"])
         tot_in += inherit
-        hybrid = len(rv[system]["hybrid"])
+        hybrid = len(values["hybrid"])
         tot_hy += hybrid
-        both = len(rv[system]["Both"])
+        both = len(values["Both"])
         tot_bo += both
-        not_in = len(rv[system]["not_in"])
+        not_in = len(values["not_in"])
         tot_ni += not_in
-        not_hy = len(rv[system]["not_hy"])
+        not_hy = len(values["not_hy"])
         tot_nh += not_hy
         total = inherit + hybrid + not_in + not_hy
         totals += total
-        print(f'{system:<15} {inherit:<10} {hybrid:<8} '
-              f'{not_in:<8} {not_hy:<8} {total:<8}| {both:<8}')
-    print(f'{"Totals":<15} {tot_in:<10} {tot_hy:<8} '
-          f'{tot_ni:<8} {tot_nh:<8} {totals:<8}| {tot_bo:<8}')
-    print(f'{"Empty:":<15} {len(empty):<10}')
+        lines.append(f'{system:<15} {inherit:<10} {hybrid:<8} '
+                     f'{not_in:<8} {not_hy:<8} {total:<8}| {both:<8}')
+    lines.append(f'{"Totals":<15} {tot_in:<10} {tot_hy:<8} '
+                 f'{tot_ni:<8} {tot_nh:<8} {totals:<8}| {tot_bo:<8}')
+    lines.append(f'{"Empty:":<15} {len(empty):<10}')
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def print_list(rv, shared, inherited, both, not_in_profile, profile_ids, pretty):
@@ -246,30 +333,32 @@ def print_list(rv, shared, inherited, both, not_in_profile, profile_ids, pretty)
         if system == "Empty":
             continue
         if pretty:
-            pretty_print_list(rv[system][column], profile_ids, system)
+            pretty_print_list(values[column], profile_ids, system)
         else:
-            print({system: rv[system][column]})
+            print({system: values[column]})
 
 
 def pretty_print_list(list, profile_ids, system):
-    print(f'==== {system} ====')
+    lines = [f'==== {system} ====']
     for control in list:
         id = oscalize_control_id(control)
         if id in profile_ids:
             desc = profile_ids[id]
         else:
             desc = "Not in baseline"
-        print(f'{control:<9} {desc}')
+        lines.append(f'{control:<9} {desc}')
+    # one write per system rather than one per control
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def pretty_print_controls(rv, profile_ids, system=False):
     if system:
         pretty_print_list(rv[system], profile_ids, system)
     else:
-        for sys, controls in profile_ids.items():
-            if sys == "Empty":
+        for system, controls in profile_ids.items():
+            if system == "Empty":
                 continue
-            pretty_print_list(rv[sys], profile_ids, sys)
+            pretty_print_list(rv[system], profile_ids, system)
 
 
 @click.command()
@@ -355,7 +444,7 @@ def main(source, ars, level, empty, shared, inherited, both,
         profile_ids = read_nist_json_profile_ids(profile, quiet)
     gap_analysis = parse_opencontrol_components(source, profile_ids)
     if json_out:
-        print(json.dumps(gap_analysis, indent=4))
+        print(orjson.dumps(gap_analysis, option=orjson.OPT_INDENT_2).decode())
     else:
         rv = prepare_report(gap_analysis, quiet)
         if empty:
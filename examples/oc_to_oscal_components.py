@@ -1,12 +1,12 @@
-from itertools import groupby
+from collections import defaultdict
 from pathlib import Path
 
 import click
 
 from complianceio import opencontrol
 from complianceio.oscal import component
+from complianceio.oscal.control_ids import oscalize_control_id
 from complianceio.oscal.oscal import Metadata
-from complianceio.oscal.oscal import oscalize_control_id
 
 
 @click.command()
@@ -45,17 +45,21 @@ def main(source):
     md = Metadata(title=oc.name, version="unknown")
     cd = component.ComponentDefinition(metadata=md)
     cd.components = []
+    components = []
     for o_comp in oc.components:
         if o_comp.key:
             desc = o_comp.key
         else:
             desc = o_comp.name
         c = component.Component(title=o_comp.name, description=desc)
-        c.control_implementations = []
+        implementations = []
 
-        sorted_controls = sorted(o_comp.satisfies, key=lambda c: c.standard_key)
-        grouped_controls = groupby(sorted_controls, lambda c: c.standard_key)
-        for standard_key, o_controls in grouped_controls:
+        grouped_controls = defaultdict(list)
+        for o_control in o_comp.satisfies:
+            grouped_controls[o_control.standard_key].append(o_control)
+        # sort the few standards, not every control, to keep output order
+        for standard_key in sorted(grouped_controls):
+            o_controls = grouped_controls[standard_key]
             if standard_key in source_uri_dict:
                 source_uri = source_uri_dict[standard_key]
             else:
@@ -96,8 +100,10 @@ def main(source):
                     else:
                         ir.description = o_statement.text.strip()
                 ci.implemented_requirements.append(ir)
-            c.control_implementations.append(ci)
-        cd.add_component(c)
+            implementations.append(ci)
+        c.control_implementations = implementations
+        components.append(c)
+    cd.add_components(components)
     root = component.Model(component_definition=cd)
     print(root.json(indent=2))
 
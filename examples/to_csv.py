@@ -30,9 +30,14 @@ def main(source, dest):
                 statements[control.control_key].append(statement)
 
     writer = csv.writer(dest, dialect="unix")
+
+    # statements without a key sort and group together
+    def statement_key(s):
+        return s.key or ""
+
     for control in sorted(statements.keys()):
         for key, stmts_by_key in groupby(
-            sorted(statements[control], key=lambda s: s.key or ""), lambda s: s.key
+            sorted(statements[control], key=statement_key), statement_key
         ):
             text = "\n".join([s.text for s in stmts_by_key])
             if key:
@@ -1,11 +1,14 @@
-import json
+import sys
 from collections import defaultdict
-from itertools import groupby
 
 import click
+import orjson
 
 from complianceio.opencontrol import OpenControl
 
+# bytes of JSON lines collected before each write to stdout
+WRITE_SIZE = 64 * 1024
+
 
 @click.command()
 @click.argument(
@@ -14,27 +17,35 @@ from complianceio.opencontrol import OpenControl
 )
 @click.argument("component-name")
 def main(source, component_name):
-    oc = OpenControl.load(source)
+    oc = OpenControl.load(source, component_names={component_name})
 
-    statements = defaultdict(list)
+    statements = defaultdict(lambda: defaultdict(list))
 
     for component in oc.components:
         if component.name == component_name:
             for control in component.satisfies:
+                by_key = statements[control.control_key]
                 for statement in control.narrative:
-                    statements[control.control_key].append(statement)
-
-    for control in sorted(statements.keys()):
-        for key, stmts_by_key in groupby(
-            sorted(statements[control], key=lambda s: s.key or ""), lambda s: s.key
-        ):
-            text = "\n".join([s.text for s in stmts_by_key])
+                    by_key[statement.key or ""].append(statement.text)
+
+    # anything printed while loading goes out before the binary output
+    sys.stdout.flush()
+    out = sys.stdout.buffer
+    buf = bytearray()
+    for control, by_key in sorted(statements.items()):
+        # sort the few statement keys, not every statement
+        for key, texts in sorted(by_key.items()):
+            text = "\n".join(texts)
             if key:
                 control_label = f"{control}.{key}"
             else:
                 control_label = control
-            line = json.dumps(dict(control=control_label, text=text))
-            print(line)
+            buf += orjson.dumps(dict(control=control_label, text=text))
+            buf += b"\n"
+            if len(buf) >= WRITE_SIZE:
+                out.write(buf)
+                buf.clear()
+    out.write(buf)
 
 
 if __name__ == "__main__":
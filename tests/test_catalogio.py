@@ -57,6 +57,13 @@ def test_get_control_by_id():
     assert isinstance(control.get("params"), List)
 
 
+def test_get_control_by_id_enhancement_and_missing():
+    """Control enhancements are found by id; unknown ids give {}"""
+    control = catalog.get_control_by_id("ac-2.1")
+    assert control.get("id") == "ac-2.1"
+    assert catalog.get_control_by_id("xx-99") == {}
+
+
 def test_get_control_statement():
     """Get the control statement with placeholders"""
     control = catalog.get_control_by_id("ac-2")
@@ -1,3 +1,5 @@
+import pickle
+
 import pydantic
 import pytest
 import rtyaml
@@ -42,3 +44,365 @@ def test_invliad_control_covered_by():
     obj = rtyaml.load(data)
     with pytest.raises(pydantic.ValidationError):
         opencontrol.Control.parse_obj(obj)
+
+
+def test_resolve_components_in_process_pool(tmp_path, monkeypatch):
+    "Components resolved by worker processes match a serial resolve"
+
+    names = []
+    for i in range(3):
+        component_dir = tmp_path / "components" / f"c{i}"
+        component_dir.mkdir(parents=True)
+        (component_dir / "component.yaml").write_text(
+            f"""
+            name: Component {i}
+            satisfies:
+              - control_key: AC-{i}
+                standard_key: NIST-800-53-rev4
+            """
+        )
+        names.append(f"components/c{i}")
+    oc_yaml = opencontrol.OpenControlYaml(
+        schema_version="1.0.0", name="Test", components=names
+    )
+
+    monkeypatch.setattr(opencontrol, "PARALLEL_MIN_FILES", 1)
+    pooled = oc_yaml.resolve_components(tmp_path, max_workers=2)
+    # without max_workers no pool is started, however many files there are
+    monkeypatch.setattr(opencontrol, "ProcessPoolExecutor", None)
+    serial = oc_yaml.resolve_components(tmp_path)
+
+    assert [c.dict() for c in pooled] == [c.dict() for c in serial]
+    assert [c.satisfies[0].control_key for c in pooled] == ["AC-0", "AC-1", "AC-2"]
+    assert str(pooled[2]._file) == "components/c2/component.yaml"
+
+
+def test_load_cache_tracks_source_files(tmp_path, monkeypatch):
+    "A cached repository is reused until a file it was built from changes"
+
+    monkeypatch.setattr(opencontrol, "CACHE_DIR", tmp_path / "cache")
+    component = tmp_path / "components" / "web" / "component.yaml"
+    component.parent.mkdir(parents=True)
+    component.write_text("name: Web\n")
+    root = tmp_path / "opencontrol.yaml"
+    oc_yaml = {
+        "schema_version": "1.0.0",
+        "name": "Test",
+        "components": ["components/web"],
+    }
+    root.write_text(rtyaml.dump(oc_yaml))
+
+    first = opencontrol.load(root)
+    assert first.components[0].name == "Web"
+    assert list((tmp_path / "cache").iterdir())
+
+    component.write_text("name: Web server\n")
+    second = opencontrol.load(root)
+    assert second.components[0].name == "Web server"
+    assert str(second.components[0]._file) == "components/web/component.yaml"
+
+
+def test_load_cache_debug_lists_files(tmp_path, monkeypatch, capsys):
+    "debug=True lists the files read whether or not the cache is used"
+
+    monkeypatch.setattr(opencontrol, "CACHE_DIR", tmp_path / "cache")
+    component = tmp_path / "components" / "web" / "component.yaml"
+    component.parent.mkdir(parents=True)
+    component.write_text("name: Web\n")
+    root = tmp_path / "opencontrol.yaml"
+    oc_yaml = {
+        "schema_version": "1.0.0",
+        "name": "Test",
+        "components": ["components/web"],
+    }
+    root.write_text(rtyaml.dump(oc_yaml))
+
+    try:
+        opencontrol.load(root, debug=True)
+        uncached = capsys.readouterr().out
+        opencontrol.load(root, debug=True)
+        cached = capsys.readouterr().out
+    finally:
+        opencontrol.FILE_SIGNAL.disconnect(opencontrol.OpenControl.debug_file)
+    assert f"Loading file {component}" in uncached
+    assert cached == uncached
+
+
+def test_load_cache_relative_path(tmp_path, monkeypatch):
+    "A cache written through a relative path is used from any directory"
+
+    monkeypatch.setattr(opencontrol, "CACHE_DIR", tmp_path / "cache")
+    component = tmp_path / "oc" / "components" / "web" / "component.yaml"
+    component.parent.mkdir(parents=True)
+    component.write_text("name: Web\n")
+    oc_yaml = {
+        "schema_version": "1.0.0",
+        "name": "Test",
+        "components": ["components/web"],
+    }
+    (tmp_path / "oc" / "opencontrol.yaml").write_text(rtyaml.dump(oc_yaml))
+
+    monkeypatch.chdir(tmp_path / "oc")
+    opencontrol.load("opencontrol.yaml")
+    monkeypatch.chdir(tmp_path)
+    with monkeypatch.context() as m:
+        m.setattr(opencontrol, "_read_yaml", None)
+        cached = opencontrol.load("oc/opencontrol.yaml")
+    assert cached.components[0].name == "Web"
+
+    component.write_text("name: Web server\n")
+    changed = opencontrol.load("oc/opencontrol.yaml")
+    assert changed.components[0].name == "Web server"
+
+
+def test_load_cache_notices_new_fen_family(tmp_path, monkeypatch):
+    "Creating a fen family file that was missing invalidates the cache"
+
+    monkeypatch.setattr(opencontrol, "CACHE_DIR", tmp_path / "cache")
+    component = tmp_path / "components" / "web" / "component.yaml"
+    component.parent.mkdir(parents=True)
+    component.write_text(
+        rtyaml.dump(
+            {
+                "schema_version": "3.1.0",
+                "name": "Web",
+                "satisfies": ["AC.yaml", "AU.yaml"],
+            }
+        )
+    )
+    (component.parent / "AC.yaml").write_text(
+        rtyaml.dump(
+            {
+                "family": "AC",
+                "satisfies": [{"control_key": "AC-2", "standard_key": "NIST"}],
+            }
+        )
+    )
+    root = tmp_path / "opencontrol.yaml"
+    oc_yaml = {
+        "schema_version": "1.0.0",
+        "name": "Test",
+        "components": ["components/web"],
+    }
+    root.write_text(rtyaml.dump(oc_yaml))
+
+    assert len(opencontrol.load(root).components[0].satisfies) == 1
+    (component.parent / "AU.yaml").write_text(
+        rtyaml.dump(
+            {
+                "family": "AU",
+                "satisfies": [{"control_key": "AU-2", "standard_key": "NIST"}],
+            }
+        )
+    )
+    satisfies = opencontrol.load(root).components[0].satisfies
+    assert [c.control_key for c in satisfies] == ["AC-2", "AU-2"]
+
+
+def test_load_trusted_matches_validated(tmp_path, monkeypatch):
+    "Loading with validate=False builds the same repository without validation"
+
+    monkeypatch.setattr(opencontrol, "CACHE_DIR", tmp_path / "cache")
+    component = tmp_path / "components" / "web" / "component.yaml"
+    component.parent.mkdir(parents=True)
+    component.write_text(
+        rtyaml.dump(
+            {
+                "name": "Web",
+                "satisfies": [
+                    {
+                        "control_key": "AC-2",
+                        "standard_key": "NIST-800-53",
+                        "implementation_statuses": ["complete"],
+                        "narrative": [{"text": "Accounts are managed."}],
+                    }
+                ],
+            }
+        )
+    )
+    root = tmp_path / "opencontrol.yaml"
+    oc_yaml = {
+        "schema_version": "1.0.0",
+        "name": "Test",
+        "components": ["components/web"],
+    }
+    root.write_text(rtyaml.dump(oc_yaml))
+
+    validated = opencontrol.load(root)
+    trusted = opencontrol.load(root, validate=False)
+    control = trusted.components[0].satisfies[0]
+    assert isinstance(control, opencontrol.Control)
+    assert control.narrative[0].text == "Accounts are managed."
+    assert control.implementation_statuses == {"complete"}
+    assert trusted.components[0].name == validated.components[0].name
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+
+
+def test_fen_family_shared_between_components(tmp_path):
+    "A family file used by two fen components is parsed once"
+
+    (tmp_path / "AC.yaml").write_text(
+        rtyaml.dump(
+            {
+                "family": "AC",
+                "satisfies": [{"control_key": "AC-2", "standard_key": "NIST"}],
+            }
+        )
+    )
+    names = []
+    for i in range(2):
+        component_dir = tmp_path / "components" / f"c{i}"
+        component_dir.mkdir(parents=True)
+        (component_dir / "component.yaml").write_text(
+            rtyaml.dump(
+                {
+                    "schema_version": "3.1.0",
+                    "name": f"Component {i}",
+                    "satisfies": ["../../AC.yaml"],
+                }
+            )
+        )
+        names.append(f"components/c{i}")
+    oc_yaml = opencontrol.OpenControlYaml(
+        schema_version="1.0.0", name="Test", components=names
+    )
+
+    opencontrol._load_family.cache_clear()
+    first, second = oc_yaml.resolve_components(tmp_path)
+    assert opencontrol._load_family.cache_info().misses == 1
+    assert first.satisfies[0].control_key == second.satisfies[0].control_key
+    assert first.satisfies[0] is not second.satisfies[0]
+    assert first.satisfies[0]._file.name == "AC.yaml"
+
+
+def test_nested_elements_are_not_copied():
+    "Validating a model keeps the element instances passed to it"
+
+    control = opencontrol.Control(control_key="AC-2", standard_key="NIST")
+    control._file = "AC.yaml"
+    component = opencontrol.Component(name="Web", satisfies=[control])
+    assert component.satisfies[0] is control
+
+
+def test_keys_are_interned_after_unpickling():
+    "Control keys stay shared when elements come back from another process"
+
+    controls = [
+        pickle.loads(
+            pickle.dumps(opencontrol.Control(control_key="AC-2", standard_key="NIST"))
+        )
+        for _ in range(2)
+    ]
+    assert controls[0].control_key is controls[1].control_key
+    assert controls[0].standard_key is controls[1].standard_key
+
+
+def test_load_only_named_components(tmp_path, monkeypatch):
+    "component_names limits which components are resolved"
+
+    monkeypatch.setattr(opencontrol, "CACHE_DIR", tmp_path / "cache")
+    names = []
+    for i in range(3):
+        component_dir = tmp_path / "components" / f"c{i}"
+        component_dir.mkdir(parents=True)
+        (component_dir / "component.yaml").write_text(f"name: Component {i}\n")
+        names.append(f"components/c{i}")
+    root = tmp_path / "opencontrol.yaml"
+    oc_yaml = {"schema_version": "1.0.0", "name": "Test", "components": names}
+    root.write_text(rtyaml.dump(oc_yaml))
+
+    some = opencontrol.load(root, component_names={"Component 1"})
+    assert [c.name for c in some.components] == ["Component 1"]
+    every = opencontrol.load(root)
+    assert len(every.components) == 3
+
+
+def test_standard_parsed_once_per_process(tmp_path):
+    "A standard shared by two loads is parsed once and copied per load"
+
+    standard = tmp_path / "nist.yaml"
+    standard.write_text(
+        rtyaml.dump(
+            {
+                "name": "NIST",
+                "AC-2": {"family": "AC", "name": "Accounts", "description": "d"},
+            }
+        )
+    )
+    oc_yaml = opencontrol.OpenControlYaml(
+        schema_version="1.0.0", name="Test", standards=["nist.yaml"]
+    )
+
+    opencontrol._load_standard.cache_clear()
+    first = oc_yaml.resolve_standards(tmp_path)["NIST"]
+    second = oc_yaml.resolve_standards(tmp_path)["NIST"]
+    assert opencontrol._load_standard.cache_info().misses == 1
+    assert first is not second
+    assert first.controls["AC-2"].family == "AC"
+
+    first.controls["AC-2"].name = "Edited"
+    third = oc_yaml.resolve_standards(tmp_path)["NIST"]
+    assert third.controls["AC-2"].name == "Accounts"
+
+
+def test_null_statement_key():
+    "A narrative entry with an explicit null key still loads"
+
+    obj = rtyaml.load(
+        """
+        control_key: AC-2
+        standard_key: NIST
+        narrative:
+          - key: null
+            text: Accounts are managed.
+        """
+    )
+    control = opencontrol.Control.parse_obj(obj)
+    assert control.narrative[0].key is None
+
+
+def test_fen_family_cache_not_edited_through_loads(tmp_path):
+    "Editing a loaded control leaves the cached family untouched"
+
+    (tmp_path / "AC.yaml").write_text(
+        rtyaml.dump(
+            {
+                "family": "AC",
+                "satisfies": [
+                    {
+                        "control_key": "AC-2",
+                        "standard_key": "NIST",
+                        "narrative": [{"text": "Original"}],
+                    }
+                ],
+            }
+        )
+    )
+    component_dir = tmp_path / "components" / "fen"
+    component_dir.mkdir(parents=True)
+    (component_dir / "component.yaml").write_text(
+        rtyaml.dump(
+            {"schema_version": "3.1.0", "name": "Fen", "satisfies": ["../../AC.yaml"]}
+        )
+    )
+    oc_yaml = opencontrol.OpenControlYaml(
+        schema_version="1.0.0", name="Test", components=["components/fen"]
+    )
+
+    (first,) = oc_yaml.resolve_components(tmp_path)
+    first.satisfies[0].narrative[0].text = "Edited"
+    (second,) = oc_yaml.resolve_components(tmp_path)
+    assert second.satisfies[0].narrative[0].text == "Original"
+
+
+def test_load_cache_keyed_on_models(tmp_path, monkeypatch):
+    "A cache written for other models is not loaded"
+
+    root = tmp_path / "opencontrol.yaml"
+    before = opencontrol._cache_path(root, True, None)
+    monkeypatch.setattr(opencontrol, "CACHE_FORMAT", opencontrol.CACHE_FORMAT + 1)
+    opencontrol._cache_schema.cache_clear()
+    try:
+        assert opencontrol._cache_path(root, True, None) != before
+    finally:
+        opencontrol._cache_schema.cache_clear()
@@ -1,6 +1,9 @@
+import io
+import json
+
 from complianceio.oscal import component
+from complianceio.oscal.control_ids import oscalize_control_id
 from complianceio.oscal.oscal import Metadata
-from complianceio.oscal.oscal import oscalize_control_id
 
 
 def test_component():
@@ -28,3 +31,14 @@ def test_component():
     root = component.Model(component_definition=cd)
     assert root is not None
     print(root.json(indent=2))
+
+    out = io.BytesIO()
+    root.stream_json(out)
+    assert json.loads(out.getvalue()) == json.loads(root.json())
+
+
+def test_add_property_repeated_name():
+    ir = component.ImplementedRequirement(control_id="ac-1", description="AC-1")
+    ir.add_property(component.Property(name="tag", value="one"))
+    ir.add_property(component.Property(name="tag", value="two"))
+    assert [p.value for p in ir.props] == ["one", "two"]
@@ -0,0 +1,36 @@
+import pytest
+
+from complianceio.oscal.control_ids import control_to_statement_id
+from complianceio.oscal.control_ids import oscalize_control_id
+
+
+@pytest.mark.parametrize(
+    "control_id, expected",
+    [
+        ("3.1.1", "3.1.1"),
+        ("AC-1", "ac-1"),
+        ("AC-01", "ac-1"),
+        ("AC-2(1)", "ac-2.1"),
+        ("AC-2 (12)", "ac-2.12"),
+        ("AC-1.a", "ac-1"),
+        ("AC-2(1).b", "ac-2.1"),
+        (" Something-Else ", "something-else"),
+    ],
+)
+def test_oscalize_control_id(control_id, expected):
+    assert oscalize_control_id(control_id) == expected
+
+
+@pytest.mark.parametrize(
+    "control_id, expected",
+    [
+        ("3.1.1", "3.1.1_smt"),
+        ("AC-1", "ac-1_smt"),
+        ("AC-2(1)", "ac-2.1_smt"),
+        ("AC-1.a", "ac-1_smt.a"),
+        ("AC-2(1).b", "ac-2.1_smt.b"),
+        ("Something-Else", "something-else_smt"),
+    ],
+)
+def test_control_to_statement_id(control_id, expected):
+    assert control_to_statement_id(control_id) == expected
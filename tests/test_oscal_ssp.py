@@ -1,37 +1,45 @@
-from complianceio.oscal.oscal import BackMatter
-from complianceio.oscal.oscal import Metadata
-from complianceio.oscal.oscal import Party
-from complianceio.oscal.oscal import Resource
-from complianceio.oscal.oscal import Role
-from complianceio.oscal.ssp import ByComponent
-from complianceio.oscal.ssp import Component
-from complianceio.oscal.ssp import ControlImplementation
-from complianceio.oscal.ssp import Impact
-from complianceio.oscal.ssp import ImplementedRequirement
-from complianceio.oscal.ssp import ImportProfile
-from complianceio.oscal.ssp import InformationType
-from complianceio.oscal.ssp import Model
-from complianceio.oscal.ssp import NetworkDiagram
-from complianceio.oscal.ssp import SecurityImpactLevel
-from complianceio.oscal.ssp import SetParameter
-from complianceio.oscal.ssp import Statement
-from complianceio.oscal.ssp import SystemCharacteristics
-from complianceio.oscal.ssp import SystemId
-from complianceio.oscal.ssp import SystemImplementation
-from complianceio.oscal.ssp import SystemInformation
-from complianceio.oscal.ssp import SystemSecurityPlan
-from complianceio.oscal.ssp import SystemStatus
-from complianceio.oscal.ssp import User
-
-
-def test_ssp():
-    md = Metadata(title="System Security Plan", version="1.2.3")
+import io
+import json
+from uuid import uuid4
+
+import pytest
+
+from complianceio.oscal.oscal import BackMatter, Metadata, Party, Resource, Role
+from complianceio.oscal.ssp import (
+    ByComponent,
+    Component,
+    ControlImplementation,
+    Impact,
+    ImplementedRequirement,
+    ImportProfile,
+    InformationType,
+    Model,
+    NetworkDiagram,
+    SecurityImpactLevel,
+    SetParameter,
+    Statement,
+    SystemCharacteristics,
+    SystemId,
+    SystemImplementation,
+    SystemInformation,
+    SystemSecurityPlan,
+    SystemStatus,
+    User,
+)
+
+
+@pytest.fixture(scope="module")
+def ssp_model():
+    "A complete SSP, built once for the tests that only read it"
     ciso = Role(id="security-operations", title="CISO")
     fen = Party(type="person", name="Fen", email_addresses=["fen@civicactions.com"])
     tom = Party(type="person", name="Tom", email_addresses=["tom@civicactions.com"])
-    md.parties = [fen, tom]
-    md.roles = [ciso]
-    md.responsible_parties
+    md = Metadata(
+        title="System Security Plan",
+        version="1.2.3",
+        parties=[fen, tom],
+        roles=[ciso],
+    )
 
     ip = ImportProfile(href="https://nist.gov/800-53-rev4")
     ssec = SecurityImpactLevel(
@@ -49,6 +57,7 @@ def test_ssp():
     sinfo = SystemInformation(information_types=[itype])
     sids = SystemId(id="test")
     ab = NetworkDiagram(description="Authorization Boundary")
+    operational = SystemStatus(state="operational")
     sc = SystemCharacteristics(
         system_ids=[sids],
         system_name="ODP",
@@ -57,35 +66,33 @@ def test_ssp():
         security_sensitivity_level="moderate",
         security_impact_level=ssec,
         authorization_boundary=ab,
-        status=SystemStatus(state="operational"),
+        status=operational,
     )
-    si = SystemImplementation()
+    user = User(short_name="User Short Name")
+    si = SystemImplementation(users=[user])
     this_system = Component(
         title="This System",
         type="this-system",
         description="This System",
-        status=SystemStatus(state="operational"),
+        status=operational,
     )
     drupal = Component(
         title="Drupal",
         type="software",
         description="Drupal",
-        status=SystemStatus(state="operational"),
+        status=operational,
     )
-    user = User(short_name="User Short Name")
-    si.add_component(this_system).add_component(drupal)
-    si.users = [user]
-    ir = ImplementedRequirement(control_id="AC-1", description="Access Control")
-    ir.add_by_component(
-        ByComponent(component_uuid=drupal.uuid, description="AC-1 provided by Drupal")
+    si.add_components([this_system, drupal])
+    by_drupal = ByComponent(
+        component_uuid=drupal.uuid, description="AC-1 provided by Drupal"
     )
-    ir.add_parameter(SetParameter(param_id="AC-1_prm_1", values=["every 30 days"]))
-    ir.add_statement(
-        Statement(statement_id="AC-1_smt").add_by_component(
-            ByComponent(
-                component_uuid=drupal.uuid, description="AC-1 provided by Drupal"
-            )
-        )
+    statement = Statement(statement_id="AC-1_smt", by_components=[by_drupal])
+    ir = ImplementedRequirement(
+        control_id="AC-1",
+        description="Access Control",
+        by_components=[by_drupal],
+        set_parameters=[SetParameter(param_id="AC-1_prm_1", values=["every 30 days"])],
+        statements=[statement],
     )
     ci = ControlImplementation(
         description="Our requirements", implemented_requirements=[ir]
@@ -100,5 +107,108 @@ def test_ssp():
         control_implementation=ci,
         back_matter=bm,
     )
-    root = Model(system_security_plan=ssp)
-    assert root is not None
+    return Model(system_security_plan=ssp)
+
+
+def test_ssp(ssp_model):
+    assert ssp_model is not None
+    assert ssp_model.system_security_plan.metadata.responsible_parties is None
+
+
+def test_ssp_json(ssp_model):
+    dumped = ssp_model.json()
+    assert '"system-name":"ODP"' in dumped
+    assert '"param-id":"AC-1_prm_1"' in dumped
+    # unset optional fields are left out rather than written as null
+    assert "null" not in dumped
+
+
+def test_ssp_json_dumps_options(ssp_model):
+    expected = json.loads(ssp_model.json())
+    indented = ssp_model.json(indent=4)
+    assert '\n    "system-security-plan"' in indented
+    compact = ssp_model.json(separators=(",", ":"), ensure_ascii=False)
+    assert json.loads(indented) == json.loads(compact) == expected
+
+
+def test_ssp_stream_json(ssp_model):
+    out = io.BytesIO()
+    ssp_model.stream_json(out)
+    assert json.loads(out.getvalue()) == json.loads(ssp_model.json())
+
+
+def test_ssp_from_trusted(ssp_model):
+    trusted = Model.from_trusted(json.loads(ssp_model.json()))
+    assert json.loads(trusted.json()) == json.loads(ssp_model.json())
+
+
+def test_add_by_component_duplicate():
+    drupal = Component(
+        title="Drupal",
+        type="software",
+        description="Drupal",
+        status=SystemStatus(state="operational"),
+    )
+    drupal_uuid = drupal.uuid
+    ir = ImplementedRequirement(control_id="AC-1")
+    statement = Statement(statement_id="AC-1_smt")
+    for container in (ir, statement):
+        container.add_by_component(
+            ByComponent(component_uuid=drupal_uuid, description="First")
+        )
+        with pytest.raises(KeyError):
+            container.add_by_component(
+                ByComponent(component_uuid=drupal_uuid, description="Second")
+            )
+        assert len(container.by_components) == 1
+
+
+def test_add_by_components():
+    uuids = [uuid4() for _ in range(3)]
+    statement = Statement(statement_id="AC-1_smt")
+    statement.add_by_components(
+        ByComponent(component_uuid=u, description="Batch") for u in uuids[:2]
+    )
+    statement.add_by_component(ByComponent(component_uuid=uuids[2], description="One"))
+    assert [bc.component_uuid for bc in statement.by_components] == uuids
+    with pytest.raises(KeyError):
+        statement.add_by_components(
+            [
+                ByComponent(component_uuid=uuid4(), description="New"),
+                ByComponent(component_uuid=uuids[0], description="Duplicate"),
+            ]
+        )
+    assert len(statement.by_components) == 3
+
+
+def test_add_by_component_after_list_changed():
+    first = ByComponent(component_uuid=uuid4(), description="First")
+    second = ByComponent(component_uuid=uuid4(), description="Second")
+    statement = Statement(statement_id="AC-1_smt")
+    statement.add_by_component(first)
+
+    # a reassigned list is indexed afresh
+    statement.by_components = [second]
+    statement.add_by_component(first)
+    assert len(statement.by_components) == 2
+
+    # and so is a list changed in length some other way
+    third = ByComponent(component_uuid=uuid4(), description="Third")
+    statement.by_components.append(third)
+    with pytest.raises(KeyError):
+        statement.add_by_component(
+            ByComponent(component_uuid=third.component_uuid, description="Again")
+        )
+    del statement.by_components[0]
+    statement.add_by_component(second)
+    assert len(statement.by_components) == 3
+
+
+def test_add_by_component_to_trusted_tree(ssp_model):
+    trusted = Model.from_trusted(json.loads(ssp_model.json()))
+    ir = trusted.system_security_plan.control_implementation.implemented_requirements[0]
+    existing = ssp_model.system_security_plan.system_implementation.components[1]
+    with pytest.raises(KeyError):
+        ir.add_by_component(
+            ByComponent(component_uuid=existing.uuid, description="Again")
+        )
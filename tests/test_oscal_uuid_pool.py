@@ -0,0 +1,54 @@
+import copy
+import os
+import pickle
+import signal
+import uuid
+
+import pytest
+
+from complianceio.oscal._uuid_pool import _BLOCK_SIZE
+from complianceio.oscal._uuid_pool import CachedUUID
+from complianceio.oscal._uuid_pool import _pool
+from complianceio.oscal._uuid_pool import fast_uuid4
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_fast_uuid4_in_child_forked_while_locked():
+    """A child forked while the pool lock is held can still mint UUIDs"""
+    with _pool.lock:
+        pid = os.fork()
+        if pid == 0:
+            # a deadlocked child is killed by the alarm
+            signal.alarm(5)
+            fast_uuid4()
+            os._exit(0)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+def test_fast_uuid4_is_random_rfc_4122():
+    """Pooled UUIDs carry the version 4 and RFC 4122 variant bits"""
+    u = fast_uuid4()
+    assert isinstance(u, CachedUUID)
+    assert u.version == 4
+    assert u.variant == uuid.RFC_4122
+    assert uuid.UUID(str(u)) == u
+
+
+def test_fast_uuid4_unique_across_refills():
+    """UUIDs stay unique when the pool refills its entropy buffer"""
+    count = 3 * _BLOCK_SIZE // 16 + 1
+    uuids = [fast_uuid4() for _ in range(count)]
+    assert len(set(uuids)) == count
+    assert all(u.version == 4 for u in uuids)
+
+
+def test_cached_uuid_survives_pickle_and_deepcopy():
+    """A CachedUUID round-trips with its value and cached string"""
+    u = fast_uuid4()
+    text = str(u)
+    for other in (pickle.loads(pickle.dumps(u)), copy.deepcopy(u)):
+        assert isinstance(other, CachedUUID)
+        assert other == u
+        assert str(other) == text
+        assert hash(other) == hash(u)